@@ -4,12 +4,12 @@
 import json
 import time
 import os
+import shutil
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 def get_app_dir():
     """获取应用程序目录"""
@@ -20,12 +20,67 @@ def get_app_dir():
         # 开发环境
         return os.path.dirname(os.path.abspath(__file__))
 
+LOGIN_COOKIE_NAMES = ['SESSDATA', 'bili_jct', 'DedeUserID', 'DedeUserID__ckMd5']
+
+
+def detect_chrome_version() -> Optional[str]:
+    """检测本机 Chrome 的版本号，检测失败时返回 None"""
+    try:
+        from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
 class BilibiliAutoLogin:
     
     def __init__(self):
-        self.driver: Optional[webdriver.Chrome] = None
+        self.driver: Optional['webdriver.Chrome'] = None
+        self.driver_cache_path = os.path.join(get_app_dir(), 'chromedriver_cache.json')
+        self.profile_dir = os.path.join(get_app_dir(), 'browser_profile')
+    
+    def clear_profile(self):
+        """删除浏览器登录使用的用户目录，其中保存着仍然有效的B站会话
+
+        浏览器窗口仍在运行时部分文件可能被占用而无法删除，此时抛出 OSError。
+        """
+        if os.path.isdir(self.profile_dir):
+            shutil.rmtree(self.profile_dir)
+    
+    def resolve_driver_path(self) -> str:
+        """获取 ChromeDriver 路径
+
+        按 Chrome 版本缓存已下载的驱动路径，版本不变时不再联网解析。
+        """
+        chrome_version = detect_chrome_version()
+        cache = {}
+        try:
+            with open(self.driver_cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        
+        cached_path = cache.get(chrome_version) if chrome_version else None
+        if cached_path and os.path.exists(cached_path):
+            return cached_path
+        
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
+        if chrome_version:
+            cache[chrome_version] = driver_path
+            try:
+                with open(self.driver_cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f, indent=2, ensure_ascii=False)
+            except OSError:
+                pass
+        return driver_path
     
     def setup_driver(self):
+        # Selenium 只在真正需要浏览器登录时才加载
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
@@ -35,59 +90,67 @@ class BilibiliAutoLogin:
         chrome_options.add_argument('--log-level=3')
         chrome_options.add_argument('--silent')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        # 使用固定的用户目录，之前登录过的浏览器会话可以直接复用
+        chrome_options.add_argument(f'--user-data-dir={self.profile_dir}')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument('--window-size=1280,720')
-        service = Service(ChromeDriverManager().install())
+        service = Service(self.resolve_driver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
-    def manual_login_bilibili(self) -> Optional[Dict]:
+    def _login_cookies(self) -> Dict:
+        """读取浏览器中的登录 Cookie"""
+        return {cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()
+                if cookie['name'] in LOGIN_COOKIE_NAMES}
+
+    def _wait_for_refresh_token(self, timeout: float = 3.0, interval: float = 0.2) -> Optional[str]:
+        """网页端把刷新 Cookie 用的 refresh_token 保存在 localStorage 中，登录后稍等片刻才会写入"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                refresh_token = self.driver.execute_script("return localStorage.getItem('ac_time_value');")
+                if refresh_token:
+                    return refresh_token
+            except Exception:
+                pass
+            time.sleep(interval)
+        return None
+
+    def manual_login_bilibili(self, max_wait_time: float = 300, poll_interval: float = 0.5) -> Optional[Dict]:
+        """打开浏览器等待用户登录
+
+        每隔 poll_interval 秒检查一次登录 Cookie，出现后立即返回；
+        浏览器用户目录中已有登录状态时无需再次登录。
+        """
         try:
             self.setup_driver()
             print("正在打开B站登录页面...")
-            if self.driver != None:
-                self.driver.get("https://passport.bilibili.com/login")
+            self.driver.get("https://passport.bilibili.com/login")
             
             print("请在浏览器中手动登录，程序将自动检测登录状态...")
             
-            max_wait_time = 300
-            start_time = time.time()
+            deadline = time.monotonic() + max_wait_time
+            cookie_dict = {}
             
-            while time.time() - start_time < max_wait_time:
+            while time.monotonic() < deadline:
                 try:
-                    if self.driver != None:
-                        current_url = self.driver.current_url
-                    
-                    if any([
-                        "www.bilibili.com" in current_url and "passport" not in current_url,
-                        "space.bilibili.com" in current_url,
-                        "member.bilibili.com" in current_url
-                    ]):
+                    cookie_dict = self._login_cookies()
+                    if 'SESSDATA' in cookie_dict and 'bili_jct' in cookie_dict:
                         print("登录成功！正在获取凭据...")
                         break
-                        
-                    time.sleep(2)
                 except Exception:
-                    time.sleep(2)
-                    continue
+                    pass
+                time.sleep(poll_interval)
             else:
                 print("登录超时")
                 return None
             
-            if self.driver != None:
-                cookies = self.driver.get_cookies()
-            cookie_dict = {}
-            
-            for cookie in cookies:
-                if cookie['name'] in ['SESSDATA', 'bili_jct', 'DedeUserID', 'DedeUserID__ckMd5']:
-                    cookie_dict[cookie['name']] = cookie['value']
+            refresh_token = self._wait_for_refresh_token()
+            if refresh_token:
+                cookie_dict['refresh_token'] = refresh_token
             
-            if 'SESSDATA' in cookie_dict and 'bili_jct' in cookie_dict:
-                return cookie_dict
-            else:
-                print("获取凭据失败")
-                return None
+            return cookie_dict
                 
         except Exception as e:
             print(f"登录失败: {e}")
@@ -96,7 +159,6 @@ class BilibiliAutoLogin:
         finally:
             if self.driver:
                 try:
-                    time.sleep(2)
                     self.driver.quit()
                 except:
                     pass
@@ -104,27 +166,32 @@ class BilibiliAutoLogin:
     def create_config_file(self, cookies: Dict) -> bool:
         try:
             config_template = {
-                "cookies": {
-                    "SESSDATA": "",
-                    "bili_jct": "",
-                    "DedeUserID": ""
-                },
+                "cookies": {},
+                "refresh_token": "",
                 "headers": {
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
                     "Referer": "https://www.bilibili.com/"
                 },
                 "settings": {
                     "delay_between_requests": 1.0,
+                    "min_requests_per_second": 0.2,
+                    "max_requests_per_second": 5.0,
                     "max_retries": 3,
                     "batch_size": 50,
+                    "parallel_fetch": True,
+                    "max_concurrent_pages": 4,
+                    "pool_size": 10,
+                    "credential_check_interval": 21600,
+                    "keep_raw_user_data": False,
                     "test_mode": False,
                     "max_test_operations": 5
                 }
             }
             
-            config_template["cookies"]["SESSDATA"] = cookies.get("SESSDATA", "")
-            config_template["cookies"]["bili_jct"] = cookies.get("bili_jct", "")
-            config_template["cookies"]["DedeUserID"] = cookies.get("DedeUserID", "")
+            # 保存全部登录 Cookie，包括校验用的 DedeUserID__ckMd5
+            for name in LOGIN_COOKIE_NAMES:
+                config_template["cookies"][name] = cookies.get(name, "")
+            config_template["refresh_token"] = cookies.get("refresh_token", "")
             
             config_file_path = os.path.join(get_app_dir(), 'config.json')
             with open(config_file_path, 'w', encoding='utf-8') as f:
@@ -136,7 +203,20 @@ class BilibiliAutoLogin:
             print(f"创建配置文件失败: {e}")
             return False
 
-def auto_login_setup() -> bool:
+def auto_login_setup(backend: str = 'qr') -> bool:
+    """登录并写入配置文件
+
+    Args:
+        backend: 'qr' 在终端显示二维码扫码登录，'browser' 打开浏览器手动登录，
+                 'cookies' 从本机已登录的浏览器中导入
+    """
+    if backend == 'qr':
+        from qr_login import qr_login_setup
+        return qr_login_setup()
+    if backend == 'cookies':
+        from browser_cookies import browser_cookie_login_setup
+        return browser_cookie_login_setup()
+
     print("程序将打开B站登录页面，请手动登录")
     
     login_tool = BilibiliAutoLogin()
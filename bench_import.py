@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""入口模块冷启动导入耗时基准
+
+使用 python -X importtime 分别导入 main、gui、cli 三个入口，
+输出总耗时和最慢的依赖，并检查命令行入口没有加载 Selenium。
+
+用法: python bench_import.py [--runs 5] [--top 8]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+# app 只在 main() 中导入 gui，直接导入 app 测不到图形界面的加载耗时
+ENTRY_POINTS = ("main", "gui", "cli")
+
+# 命令行导出不应加载的重量级依赖
+HEAVY_MODULES = ("selenium", "webdriver_manager")
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import(code: str) -> Tuple[int, Dict[str, int]]:
+    """在新进程中执行 code
+
+    Returns:
+        (顶层导入的总耗时, {模块名: 累计耗时})，单位为微秒
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=APP_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == "site":
+            # 解释器启动时由 site 引入的模块与入口无关，丢弃之前的记录
+            total = 0
+            modules = {}
+            continue
+        modules[name.strip()] = int(cumulative)
+        # 名称前只有一个空格的是顶层导入
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="入口模块导入耗时基准")
+    parser.add_argument("--runs", type=int, default=5, help="每个入口测量的次数")
+    parser.add_argument("--top", type=int, default=8, help="显示最慢的依赖数量")
+    args = parser.parse_args()
+
+    failed = False
+    for entry in ENTRY_POINTS:
+        totals = []
+        modules = {}
+        for _ in range(args.runs):
+            total, modules = measure_import(f"import {entry}")
+            totals.append(total)
+
+        print(f"{entry}: 中位数 {statistics.median(totals) / 1000:.1f} ms（{args.runs} 次）")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, cumulative in slowest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+        heavy = sorted({name for name in modules if name.split(".")[0] in HEAVY_MODULES})
+        if heavy:
+            failed = True
+            print(f"    ✗ 导入时加载了 {', '.join(heavy)}")
+
+    # 命令行导出路径：解析参数并导入登录模块，也不应加载 Selenium
+    code = "import cli, auto_login; cli.parse_args(['export'])"
+    _, modules = measure_import(code)
+    heavy = sorted({name for name in modules if name.split(".")[0] in HEAVY_MODULES})
+    if heavy:
+        failed = True
+        print(f"cli export: ✗ 加载了 {', '.join(heavy)}")
+    else:
+        print("cli export: ✓ 未加载 Selenium")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,20 @@
 import requests
+import hashlib
 import json
 import time
 import os
+import queue
+import re
 import sys
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import logging
+from requests.adapters import HTTPAdapter
+
+from following_store import FollowingStore
+from following_user import FollowingUser
+from job_journal import JobJournal
 
 def get_app_dir():
     """获取应用程序目录"""
@@ -15,6 +25,357 @@ def get_app_dir():
         # 开发环境
         return os.path.dirname(os.path.abspath(__file__))
 
+RELATION_FOLLOW = 1    # 关注
+RELATION_UNFOLLOW = 2  # 取消关注
+
+# 表示已关注的关系属性：悄悄关注、已关注、互相关注
+FOLLOWED_ATTRIBUTES = {1, 2, 6}
+
+# 限流与风控相关的错误码
+RISK_CONTROL_CODES = {-412, -352, 22015}
+
+# 账号未登录（Cookie 已失效）
+NOT_LOGGED_IN_CODE = -101
+
+# 刷新 Cookie 时用于加密 correspondPath 的B站公钥（RSA-1024）
+REFRESH_PUBLIC_KEY_N = int(
+    'cb81dd8e02470656da04dd38544446e2a3412051cfe9adc6a330a5ef90228509'
+    '684960970b91c3360ca29c49e1690ff8fa068cb9dfc6179d1e9585cb9424e847'
+    'db1ef59f33e37dd4dca8ccfb7631ee9b4a92640d00c8204300152a0ab7cd8028'
+    '89d3445aec69918fe6022b534912e7b095be3424dad1ba81145e969b533181f1', 16)
+REFRESH_PUBLIC_KEY_E = 65537
+
+COOKIE_NAMES = ['SESSDATA', 'bili_jct', 'DedeUserID', 'DedeUserID__ckMd5']
+
+
+class RateLimiter:
+    """令牌桶限流器，按 AIMD 策略自适应调整速率
+
+    每个请求发出前先取一个令牌。收到限流响应时速率乘性减小，
+    响应正常时速率加性增大，使吞吐量稳定在服务器真实限制之下。
+    """
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, burst: float = 1.0,
+                 increase: float = 0.05, decrease: float = 0.5):
+        """初始化限流器
+
+        Args:
+            rate: 初始速率（请求/秒）
+            min_rate: 最低速率
+            max_rate: 最高速率
+            burst: 令牌桶容量
+            increase: 每次成功响应增加的速率
+            decrease: 每次限流时速率的缩减系数
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.capacity = max(burst, 1.0)
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """阻塞直到取得一个令牌"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """响应正常，加性增大速率"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        """被限流，乘性减小速率并清空令牌"""
+        with self._lock:
+            now = time.monotonic()
+            # 并发请求会同时收到限流响应，同一周期内只减速一次
+            if now - self._last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class RelationExecutor:
+    """关系修改执行器
+
+    以滑动窗口并发调用 /x/relation/modify。成功率高时窗口逐步增大，
+    遇到 412 或风控错误码时窗口减半，请求速率仍由 BilibiliAPI 的限流器控制。
+    """
+
+    def __init__(self, api: 'BilibiliAPI', min_window: int = 1, max_window: int = 4,
+                 initial_window: int = 2):
+        """初始化执行器
+
+        Args:
+            api: 发送请求的 API 客户端
+            min_window: 最小并发数
+            max_window: 最大并发数
+            initial_window: 初始并发数
+        """
+        self.api = api
+        self.min_window = max(1, min_window)
+        self.max_window = max(self.min_window, max_window)
+        self.window = min(max(initial_window, self.min_window), self.max_window)
+
+    def _execute(self, fid: int, act: int) -> Tuple[bool, bool]:
+        """执行单个操作
+
+        Returns:
+            (是否成功, 是否触发限流或风控)
+        """
+        try:
+            # 只看本次请求是否重试过 412，其他并发请求的限流不影响这里的判断
+            result, throttled = self.api._modify_relation(fid, act)
+        except Exception as e:
+            self.api.logger.error(f"关系修改异常 (用户ID: {fid}): {e}")
+            return False, True
+
+        code = result.get('code')
+        if code == 0 or (act == RELATION_FOLLOW and code == 22013):
+            return True, throttled
+        self.api.logger.error(f"关系修改失败 (用户ID: {fid}, 操作: {act}): {result.get('message')}")
+        return False, throttled or code in RISK_CONTROL_CODES
+
+    def _adjust_window(self, throttled: bool):
+        if throttled:
+            self.window = max(self.min_window, self.window // 2)
+            self._streak = 0
+            return
+        self._streak += 1
+        # 连续成功满一个窗口后扩大窗口
+        if self._streak >= self.window:
+            self.window = min(self.max_window, self.window + 1)
+            self._streak = 0
+
+    def run(self, operations: Iterable[Tuple[int, int]], progress_callback=None) -> Dict:
+        """执行操作直到全部完成
+
+        Args:
+            operations: (fid, act) 操作序列，可以是按需产出的迭代器
+            progress_callback: 每完成一个操作调用一次，参数为 (fid, 是否成功)
+
+        Returns:
+            {'results': {fid: 是否成功}, 'stats': 吞吐统计}
+        """
+        results = {}
+        throttled_count = 0
+        peak_window = self.window
+        self._streak = 0
+        start_time = time.monotonic()
+        pending = iter(operations)
+        exhausted = False
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_window) as executor:
+            while in_flight or not exhausted:
+                # 按当前窗口补足在途请求
+                while not exhausted and len(in_flight) < self.window:
+                    try:
+                        fid, act = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(self._execute, fid, act)] = fid
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fid = in_flight.pop(future)
+                    success, throttled = future.result()
+                    throttled_count += throttled
+                    self._adjust_window(throttled)
+                    peak_window = max(peak_window, self.window)
+                    results[fid] = success
+                    if progress_callback:
+                        progress_callback(fid, success)
+
+        elapsed = time.monotonic() - start_time
+        success_count = sum(1 for ok in results.values() if ok)
+        stats = {
+            'total': len(results),
+            'success': success_count,
+            'failed': len(results) - success_count,
+            'throttled': throttled_count,
+            'elapsed': elapsed,
+            'ops_per_second': len(results) / elapsed if elapsed > 0 else 0.0,
+            'final_window': self.window,
+            'peak_window': peak_window,
+        }
+        return {'results': results, 'stats': stats}
+
+
+def _mgf1(seed: bytes, length: int) -> bytes:
+    """OAEP 使用的掩码生成函数 MGF1（SHA-256）"""
+    output = b''
+    counter = 0
+    while len(output) < length:
+        output += hashlib.sha256(seed + counter.to_bytes(4, 'big')).digest()
+        counter += 1
+    return output[:length]
+
+
+def rsa_oaep_encrypt(message: bytes, n: int, e: int) -> bytes:
+    """RSA-OAEP（SHA-256）加密，只在刷新 Cookie 时用到，无需额外依赖"""
+    k = (n.bit_length() + 7) // 8
+    h_len = hashlib.sha256().digest_size
+    if len(message) > k - 2 * h_len - 2:
+        raise ValueError("待加密内容过长")
+
+    data_block = hashlib.sha256(b'').digest() + b'\x00' * (k - len(message) - 2 * h_len - 2) + b'\x01' + message
+    seed = os.urandom(h_len)
+    masked_db = bytes(a ^ b for a, b in zip(data_block, _mgf1(seed, k - h_len - 1)))
+    masked_seed = bytes(a ^ b for a, b in zip(seed, _mgf1(masked_db, h_len)))
+    encoded = int.from_bytes(b'\x00' + masked_seed + masked_db, 'big')
+    return pow(encoded, e, n).to_bytes(k, 'big')
+
+
+class CredentialRefresher:
+    """登录凭据刷新
+
+    按B站网页端的 Cookie 刷新流程，用 refresh_token 换取新的 Cookie，
+    写回 config.json 并直接替换会话中的 Cookie，无需重新登录。
+    """
+
+    COOKIE_INFO_URL = "https://passport.bilibili.com/x/passport-login/web/cookie/info"
+    CORRESPOND_URL = "https://www.bilibili.com/correspond/1/{}"
+    COOKIE_REFRESH_URL = "https://passport.bilibili.com/x/passport-login/web/cookie/refresh"
+    CONFIRM_REFRESH_URL = "https://passport.bilibili.com/x/passport-login/web/confirm/refresh"
+
+    def __init__(self, api: 'BilibiliAPI', check_interval: float = 21600):
+        """初始化凭据刷新
+
+        Args:
+            api: API 客户端
+            check_interval: 两次检查是否需要刷新的最小间隔（秒）
+        """
+        self.api = api
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = None
+        self.refresh_count = 0
+
+    @property
+    def refresh_token(self) -> str:
+        return self.api.config.get('refresh_token', '')
+
+    def _new_session(self) -> requests.Session:
+        """刷新流程使用独立会话，避免响应中的 Cookie 与主会话的 Cookie 混在一起"""
+        session = requests.Session()
+        session.headers.update(self.api.config['headers'])
+        for name, value in self.api.config['cookies'].items():
+            session.cookies.set(name, value, domain='.bilibili.com')
+        return session
+
+    def _check(self, session: requests.Session) -> Tuple[bool, int]:
+        """询问服务器是否需要刷新，返回 (是否需要刷新, 服务器时间戳毫秒)"""
+        data = session.get(self.COOKIE_INFO_URL, params={'csrf': self.api.config['cookies']['bili_jct']},
+                           timeout=10).json()
+        if data['code'] == NOT_LOGGED_IN_CODE:
+            return True, int(time.time() * 1000)
+        if data['code'] != 0:
+            raise Exception(f"检查登录凭据失败: {data['message']}")
+        return data['data']['refresh'], data['data']['timestamp']
+
+    def _get_refresh_csrf(self, session: requests.Session, timestamp: int) -> str:
+        correspond_path = rsa_oaep_encrypt(f'refresh_{timestamp}'.encode(),
+                                           REFRESH_PUBLIC_KEY_N, REFRESH_PUBLIC_KEY_E).hex()
+        html = session.get(self.CORRESPOND_URL.format(correspond_path), timeout=10).text
+        match = re.search(r'<div id="1-name">\s*([^<\s]+)\s*</div>', html)
+        if not match:
+            raise Exception("获取 refresh_csrf 失败")
+        return match.group(1)
+
+    def refresh(self, force: bool = False) -> bool:
+        """检查并刷新登录凭据
+
+        Args:
+            force: 为 True 时即使服务器认为无需刷新也执行刷新
+
+        Returns:
+            是否换取了新的凭据
+        """
+        sessdata = self.api.config['cookies'].get('SESSDATA')
+        with self._lock:
+            if self.api.config['cookies'].get('SESSDATA') != sessdata:
+                return True  # 等待期间其他线程已完成刷新
+            if (not force and self._last_check is not None
+                    and time.monotonic() - self._last_check < self.check_interval):
+                return False  # 等待期间其他线程已完成检查
+            self._last_check = time.monotonic()
+            if not self.refresh_token:
+                return False
+
+            try:
+                session = self._new_session()
+                should_refresh, timestamp = self._check(session)
+                if not (should_refresh or force):
+                    return False
+
+                old_refresh_token = self.refresh_token
+                response = session.post(self.COOKIE_REFRESH_URL, data={
+                    'csrf': self.api.config['cookies']['bili_jct'],
+                    'refresh_csrf': self._get_refresh_csrf(session, timestamp),
+                    'source': 'main_web',
+                    'refresh_token': old_refresh_token
+                }, timeout=10)
+                data = response.json()
+                if data['code'] != 0:
+                    raise Exception(f"刷新登录凭据失败: {data['message']}")
+
+                # 只取本次响应下发的 Cookie，会话中预先放入的旧 Cookie 不算
+                cookies = {cookie.name: cookie.value for cookie in response.cookies if cookie.name in COOKIE_NAMES}
+                if 'SESSDATA' not in cookies or 'bili_jct' not in cookies:
+                    raise Exception("刷新登录凭据失败: 响应中没有新的 Cookie")
+                self.api._apply_credentials(cookies, data['data']['refresh_token'])
+                self.refresh_count += 1
+
+                # 确认刷新后旧的 refresh_token 才会失效
+                confirm = session.post(self.CONFIRM_REFRESH_URL, data={
+                    'csrf': cookies['bili_jct'],
+                    'refresh_token': old_refresh_token
+                }, timeout=10).json()
+                if confirm['code'] != 0:
+                    self.api.logger.warning(f"确认刷新失败: {confirm['message']}")
+
+                self.api.logger.info("登录凭据已刷新")
+                return True
+
+            except Exception as e:
+                self.api.logger.warning(f"刷新登录凭据异常: {e}")
+                return False
+
+    def maybe_refresh(self):
+        """距上次检查超过间隔时，在当前线程中检查并刷新
+
+        同步执行：服务器轮换凭据后，新凭据写入 config.json 之前进程不会退出，
+        否则短时间运行的命令行导出可能只留下已失效的旧凭据。
+        其他线程正在刷新时直接跳过，请求若因此登录失效会在 _make_request 中等待刷新完成后重试。
+        """
+        if not self.refresh_token or self._lock.locked():
+            return
+        if self._last_check is not None and time.monotonic() - self._last_check < self.check_interval:
+            return
+        self.refresh()
+
+
 class BilibiliAPI:
     """Bilibili API 客户端"""
     
@@ -28,6 +389,13 @@ class BilibiliAPI:
         self.session = requests.Session()
         self.config = self._load_config(self.config_path)
         self._setup_session()
+        self.throttle_count = 0  # 收到 412 限流响应的次数
+        self.rate_limiter = self._create_rate_limiter()
+        self.store_path = os.path.join(os.path.dirname(self.config_path), 'following.db')
+        self._store: Optional[FollowingStore] = None
+        self.journal = JobJournal(os.path.join(os.path.dirname(self.config_path), 'job_journal.jsonl'))
+        self.credentials = CredentialRefresher(
+            self, check_interval=self.config['settings'].get('credential_check_interval', 21600))
         
         # 设置日志
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -47,20 +415,100 @@ class BilibiliAPI:
         """设置会话"""
         self.session.cookies.update(self.config['cookies'])
         self.session.headers.update(self.config['headers'])
+        
+        # 连接池大小决定同时在途的请求数上限
+        self.pool_size = self.config['settings'].get('pool_size', 10)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
+    def _save_config(self):
+        """写回配置文件，先写临时文件再替换，避免中途退出损坏配置"""
+        tmp_path = self.config_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.config, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.config_path)
+
+    def _apply_credentials(self, cookies: Dict, refresh_token: str):
+        """替换会话中的 Cookie 并保存新的凭据，进行中的任务无需重启"""
+        self.config['cookies'].update(cookies)
+        self.config['refresh_token'] = refresh_token
+        for name, value in cookies.items():
+            self.session.cookies.set(name, value)
+        self._save_config()
+
+    @property
+    def owner(self) -> str:
+        """当前登录账号的ID"""
+        return str(self.config['cookies']['DedeUserID'])
+
+    @property
+    def store(self) -> FollowingStore:
+        """关注列表的本地存储，首次使用时打开"""
+        if self._store is None:
+            self._store = FollowingStore(self.store_path, self.config['settings'].get('keep_raw_user_data', False))
+        return self._store
+
+    def _create_rate_limiter(self) -> RateLimiter:
+        """根据配置创建所有请求共用的限流器"""
+        settings = self.config['settings']
+        delay = settings['delay_between_requests']
+        return RateLimiter(
+            rate=1.0 / delay if delay > 0 else settings.get('max_requests_per_second', 5.0),
+            min_rate=settings.get('min_requests_per_second', 0.2),
+            max_rate=settings.get('max_requests_per_second', 5.0),
+            burst=settings.get('rate_burst', 2),
+        )
+
+    @staticmethod
+    def _is_throttled(response: requests.Response) -> bool:
+        """判断响应是否为限流（HTTP 412 或 JSON code == -412）"""
+        if response.status_code == 412:
+            return True
+        try:
+            return response.json().get('code') == -412
+        except (ValueError, AttributeError):
+            return False
+
+    @staticmethod
+    def _is_logged_out(response: requests.Response) -> bool:
+        """判断响应是否表示登录已失效（JSON code == -101）"""
+        try:
+            return response.json().get('code') == NOT_LOGGED_IN_CODE
+        except (ValueError, AttributeError):
+            return False
+
     def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """发送请求并处理重试"""
+        """发送请求并处理重试，登录失效时先刷新凭据再重试
+
+        返回的响应带有 throttled 属性，表示本次调用是否因 412 重试过。
+        """
         max_retries = self.config['settings']['max_retries']
-        delay = self.config['settings']['delay_between_requests']
+        refreshed = False
+        throttled = False
+        self.credentials.maybe_refresh()
         
         for attempt in range(max_retries + 1):
+            self.rate_limiter.acquire()
             try:
                 response = self.session.request(method, url, **kwargs)
-                if response.status_code == 200:
+                if response.status_code == 200 and not refreshed and self._is_logged_out(response):
+                    refreshed = True
+                    if self.credentials.refresh(force=True):
+                        if isinstance(kwargs.get('data'), dict) and 'csrf' in kwargs['data']:
+                            kwargs['data'] = {**kwargs['data'], 'csrf': self.config['cookies']['bili_jct']}
+                        continue
+                    response.throttled = throttled
+                    return response
+                if self._is_throttled(response):
+                    throttled = True
+                    self.throttle_count += 1
+                    self.rate_limiter.on_throttle()
+                    self.logger.warning(f"请求被限制，降低请求速率至 {self.rate_limiter.rate:.2f} 次/秒")
+                elif response.status_code == 200:
+                    self.rate_limiter.on_success()
+                    response.throttled = throttled
                     return response
-                elif response.status_code == 412:
-                    self.logger.warning("请求被限制，等待更长时间...")
-                    time.sleep(delay * 3)
                 else:
                     self.logger.warning(f"请求失败，状态码: {response.status_code}")
                     
@@ -69,7 +517,6 @@ class BilibiliAPI:
             
             if attempt < max_retries:
                 self.logger.info(f"重试第 {attempt + 1} 次...")
-                time.sleep(delay)
         
         raise Exception(f"请求失败，已重试 {max_retries} 次")
     
@@ -100,80 +547,363 @@ class BilibiliAPI:
         return data['data']
     
 
-    def get_all_following(self) -> List[Dict]:
+    def _keep_raw(self, keep_raw: Optional[bool] = None) -> bool:
+        """是否在内存中保留完整的原始数据，为 None 时读取配置 keep_raw_user_data"""
+        if keep_raw is None:
+            return self.config['settings'].get('keep_raw_user_data', False)
+        return keep_raw
+
+    @staticmethod
+    def _drop_raw(users: List[FollowingUser]) -> List[FollowingUser]:
+        for user in users:
+            user.raw = None
+        return users
+
+    def _format_users(self, following_list: List[Dict], keep_raw: Optional[bool] = None) -> List[FollowingUser]:
+        """把接口返回的用户数据转换为只含常用字段的 FollowingUser
+
+        Args:
+            following_list: 接口返回的用户数据
+            keep_raw: 是否保留完整的原始数据（导出 raw、ndjson 时需要），为 None 时读取配置
+        """
+        keep_raw = self._keep_raw(keep_raw)
+        return [FollowingUser.from_dict(user, keep_raw) for user in following_list]
+
+    def _iter_following_pages(self, ps: int) -> Iterator[List[Dict]]:
+        """按 order=desc 的顺序逐页产出关注列表
+
+        先读取第一页拿到 total，其余页在开启并发时交给线程池获取，
+        遇到 412 限流后自动退回串行模式。
+        """
+        data = self.get_following_list(1, ps)
+        page = data.get('list', [])
+        if not page:
+            return
+        yield page
+        if len(page) < ps:
+            return
+
+        settings = self.config['settings']
+        last_pn = max(1, -(-data.get('total', 0) // ps))
+        workers = settings.get('max_concurrent_pages', 4)
+        pn = 2
+
+        if settings.get('parallel_fetch', True) and workers > 1 and last_pn > 1:
+            pn = yield from self._iter_pages_parallel(2, last_pn, ps, workers)
+            if pn is None:
+                return
+
+        # 串行模式：逐页获取直到返回不足一页
+        while True:
+            page = self.get_following_list(pn, ps).get('list', [])
+            if not page:
+                return
+            yield page
+            if len(page) < ps:
+                return
+            pn += 1
+
+    def _iter_pages_parallel(self, first_pn: int, last_pn: int, ps: int, workers: int):
+        """并发获取 [first_pn, last_pn] 页，并按页码顺序产出
+
+        Returns:
+            需要继续串行获取的页码；数据已取完时返回 None
+        """
+        throttle_mark = self.throttle_count
+        futures = {}
+        next_submit = first_pn
+        pn = first_pn
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while pn <= last_pn:
+                    # 保持最多 workers 个请求在途
+                    while next_submit <= last_pn and len(futures) < workers and self.throttle_count == throttle_mark:
+                        futures[next_submit] = executor.submit(self.get_following_list, next_submit, ps)
+                        next_submit += 1
+
+                    if pn not in futures:
+                        # 已切换为串行模式，剩余页由调用方继续获取
+                        self.logger.warning(f"请求被限制，从第 {pn} 页起改为串行获取")
+                        return pn
+
+                    try:
+                        page = futures.pop(pn).result().get('list', [])
+                    except Exception as e:
+                        self.logger.warning(f"并发获取第 {pn} 页失败，改为串行获取: {e}")
+                        return pn
+
+                    if not page:
+                        return None
+                    yield page
+                    if len(page) < ps:
+                        return None
+                    pn += 1
+            finally:
+                for future in futures.values():
+                    future.cancel()
+
+        # 获取期间关注数可能增加，继续串行获取后续页
+        return pn
+
+    def _iter_stored_pages(self, ps: int, keep_raw: Optional[bool] = None) -> Iterator[List[FollowingUser]]:
+        """获取关注列表并逐页写入本地存储，全部读完后删除已不存在的用户
+
+        本地存储总是保存完整的原始数据，产出的用户是否保留原始数据由 keep_raw 决定。
+        """
+        keep_raw = self._keep_raw(keep_raw)
+        generation = self.store.start_generation(self.owner)
+        position = 0
+        for following_list in self._iter_following_pages(ps):
+            following_list = self._format_users(following_list, keep_raw=True)
+            self.store.write_page(self.owner, following_list, position, generation)
+            position += len(following_list)
+            yield following_list if keep_raw else self._drop_raw(following_list)
+        self.store.finish_generation(self.owner, generation)
+
+    def iter_following_pages(self, keep_raw: Optional[bool] = None) -> Iterator[List[FollowingUser]]:
+        """逐页获取关注用户，每解析完一页立即产出并写入本地存储
+
+        Args:
+            keep_raw: 是否保留完整的原始数据，为 None 时读取配置
+
+        Yields:
+            一页关注用户
+        """
+        ps = self.config['settings']['batch_size']
+        count = 0
+        
+        self.logger.info("开始获取关注列表...")
+        
+        try:
+            for following_list in self._iter_stored_pages(ps, keep_raw):
+                count += len(following_list)
+                self.logger.info(f"已获取 {count} 个关注用户")
+                yield following_list
+        except Exception as e:
+            self.logger.error(f"获取关注列表失败: {e}")
+        
+        self.logger.info(f"总共获取到 {count} 个关注用户")
+
+    def iter_following(self, keep_raw: Optional[bool] = None) -> Iterator[FollowingUser]:
+        """逐个产出关注用户，无需等待整个列表下载完成，参数同 iter_following_pages"""
+        for following_list in self.iter_following_pages(keep_raw):
+            yield from following_list
+
+    def get_all_following(self) -> List[FollowingUser]:
         """获取所有关注用户
         
         Returns:
             所有关注用户列表
         """
-        all_following = []
-        pn = 1
+        return list(self.iter_following())
+    
+    def has_following_snapshot(self) -> bool:
+        """本地存储中是否有可用于增量同步的完整关注列表"""
+        return 'watermark' in self.store.get_meta(self.owner)
+
+    def load_following_snapshot(self, keep_raw: Optional[bool] = None) -> Optional[Dict]:
+        """读取本地存储中上次完整同步的关注列表及其 mtime 水位线"""
+        meta = self.store.get_meta(self.owner)
+        if 'watermark' not in meta:
+            return None
+        return {
+            'watermark': meta['watermark'],
+            'total': meta['total'],
+            'list': self.store.load(self.owner, keep_raw=self._keep_raw(keep_raw))
+        }
+
+    def save_following_snapshot(self, following_list: List[FollowingUser]):
+        """用完整关注列表更新本地存储，没有原始数据的用户保留已保存的原始数据"""
+        self.store.update_order(self.owner, following_list)
+
+    def load_cached_following(self, order_by: Iterable[str] = ('position',), keyword: Optional[str] = None,
+                              keep_raw: Optional[bool] = None) -> List[FollowingUser]:
+        """从本地存储读取关注列表，不发送网络请求
+
+        Args:
+            order_by: 排序列，可选 position、mtime、uname、mid
+            keyword: 按用户名、签名或 UID 筛选
+            keep_raw: 是否保留完整的原始数据，为 None 时读取配置
+        """
+        return self.store.load(self.owner, order_by, keyword, keep_raw=self._keep_raw(keep_raw))
+
+    def iter_cached_following(self, order_by: Iterable[str] = ('position',), keyword: Optional[str] = None,
+                              keep_raw: Optional[bool] = None) -> Iterator[FollowingUser]:
+        """逐个读取本地存储的关注用户，参数同 load_cached_following"""
+        return self.store.iter_users(self.owner, order_by, keyword, keep_raw=self._keep_raw(keep_raw))
+
+    def _iter_pages_from(self, pn: int, ps: int) -> Iterator[Dict]:
+        """从第 pn 页起串行获取，产出每页的原始数据，直到返回不足一页"""
+        while True:
+            data = self.get_following_list(pn, ps)
+            yield data
+            if len(data.get('list') or []) < ps:
+                return
+            pn += 1
+
+    def _full_sync(self, keep_raw: Optional[bool] = None) -> List[FollowingUser]:
+        """完整获取关注列表，逐页写入本地存储"""
         ps = self.config['settings']['batch_size']
+        following_list = []
+        for page in self._iter_stored_pages(ps, keep_raw):
+            following_list.extend(page)
+        return following_list
+
+    def _locate_unfollowed(self, tail: List[FollowingUser], offset: int, total: int, ps: int) -> Tuple[set, Dict[int, Dict], int]:
+        """二分查找快照中已取消关注的用户
+
+        tail 是快照中排在服务器第 offset 位之后的部分。读取一页即可根据
+        页内用户在 tail 中的下标算出此前缺失的人数，缺失人数不变的区间无需再读，
+        因此找出 m 个取消关注的用户只需约 m·log(页数) 次请求。
+
+        Returns:
+            (已取消关注用户在 tail 中的下标, 读取到的最新用户数据 {下标: 用户}, 请求次数)
+
+        Raises:
+            ValueError: 服务器数据与快照无法对齐
+        """
+        index = {user.mid: j for j, user in enumerate(tail)}
+        removed = set()
+        fresh = {}
+        request_count = 0
         
-        self.logger.info("开始获取关注列表...")
+        def read(pn):
+            nonlocal request_count
+            request_count += 1
+            items = []
+            for k, user in enumerate(self.get_following_list(pn, ps).get('list') or []):
+                j = index.get(user['mid'])
+                if j is None or (items and j <= items[-1][1]):
+                    raise ValueError(f"第 {pn} 页与快照无法对齐")
+                items.append(((pn - 1) * ps + k, j))
+                fresh[j] = user
+            if not items:
+                raise ValueError(f"第 {pn} 页为空")
+            return items
         
-        while True:
-            try:
-                data = self.get_following_list(pn, ps)
-                following_list = data.get('list', [])
-                
-                if not following_list:
-                    break
-                
-                # 处理每个用户的数据
-                for user in following_list:
-                    # 转换时间戳为可读时间
-                    if 'mtime' in user and user['mtime']:
-                        try:
-                            import datetime
-                            mtime = datetime.datetime.fromtimestamp(user['mtime'])
-                            user['mtime_str'] = mtime.strftime('%Y-%m-%d %H:%M')
-                        except:
-                            user['mtime_str'] = '未知'
-                    else:
-                        user['mtime_str'] = '未知'
-                
-                all_following.extend(following_list)
-                self.logger.info(f"已获取 {len(all_following)} 个关注用户")
-                
-                # 检查是否还有更多数据
-                if len(following_list) < ps:
-                    break
-                
-                pn += 1
-                time.sleep(self.config['settings']['delay_between_requests'])
-                
-            except Exception as e:
-                self.logger.error(f"获取关注列表失败: {e}")
+        def solve(lo, hi, left, right):
+            # left/right 为 (服务器位置, tail 下标)，两者之间缺失的人数
+            gap = (right[1] - left[1]) - (right[0] - left[0])
+            if gap < 0:
+                raise ValueError("关注数与快照无法对齐")
+            if gap == 0:
+                return
+            if lo > hi:
+                # 两端在服务器列表中相邻，中间的快照用户均已取消关注
+                removed.update(range(left[1] + 1, right[1]))
+                return
+            mid = (lo + hi) // 2
+            items = read(mid)
+            for (_, j1), (_, j2) in zip(items, items[1:]):
+                removed.update(range(j1 + 1, j2))
+            solve(lo, mid - 1, left, items[0])
+            solve(mid + 1, hi, items[-1], right)
+        
+        solve(offset // ps + 1, -(-total // ps), (offset - 1, -1), (total, len(tail)))
+        return removed, fresh, request_count
+
+    def sync_following(self, keep_raw: Optional[bool] = None) -> List[FollowingUser]:
+        """增量同步关注列表
+
+        关注列表按关注时间倒序返回，只需从第一页读到快照中已有的用户为止；
+        若合并后的数量多于服务器的 total，说明有用户被取消关注，
+        再二分读取后续页找出它们。没有快照或数据无法对齐时退回完整获取。
+
+        Args:
+            keep_raw: 是否保留完整的原始数据，为 None 时读取配置
+
+        Returns:
+            最新的关注用户列表
+        """
+        keep_raw = self._keep_raw(keep_raw)
+        snapshot = self.load_following_snapshot(keep_raw)
+        if not snapshot:
+            self.logger.info("本地没有关注列表，完整获取...")
+            return self._full_sync(keep_raw)
+        
+        ps = self.config['settings']['batch_size']
+        watermark = snapshot['watermark']
+        known = snapshot['list']
+        known_mids = {user.mid for user in known}
+        request_count = 0
+        
+        # 读取新增的关注，直到遇到快照中已有的用户
+        head = []
+        total = 0
+        exhausted = False
+        for data in self._iter_pages_from(1, ps):
+            request_count += 1
+            page = data.get('list') or []
+            total = data.get('total', 0)
+            head.extend(page)
+            exhausted = len(page) < ps
+            if any(user['mid'] in known_mids and (user.get('mtime') or 0) <= watermark for user in page):
                 break
         
-        self.logger.info(f"总共获取到 {len(all_following)} 个关注用户")
-        return all_following
-    
-    def follow_user(self, fid: int) -> bool:
-        """关注用户
+        head_mids = {user['mid'] for user in head}
+        tail = [user for user in known if user.mid not in head_mids]
+        # 新读取的用户带着原始数据写入本地存储，快照中未变化的用户只更新位置
+        following_list = self._format_users(head, keep_raw=True)
+        
+        try:
+            if len(head) + len(tail) < total:
+                raise ValueError("关注数多于快照与新增之和")
+            if exhausted:
+                # 服务器列表已全部读完，快照剩余部分均已取消关注
+                tail = []
+            elif len(head) + len(tail) > total:
+                removed, fresh, count = self._locate_unfollowed(tail, len(head), total, ps)
+                request_count += count
+                tail = [self._format_users([fresh[j]], keep_raw=True)[0] if j in fresh else user
+                        for j, user in enumerate(tail) if j not in removed]
+            following_list.extend(tail)
+            if len(following_list) != total:
+                raise ValueError("同步后数量与 total 不一致")
+        except Exception as e:
+            self.logger.warning(f"增量同步数据不一致，改为完整获取: {e}")
+            return self._full_sync(keep_raw)
         
+        self.save_following_snapshot(following_list)
+        self.logger.info(f"增量同步完成，共 {len(following_list)} 个关注用户，请求 {request_count} 次")
+        return following_list if keep_raw else self._drop_raw(following_list)
+
+    def _modify_relation(self, fid: int, act: int) -> Tuple[Dict, bool]:
+        """调用 /x/relation/modify 修改关系
+
         Args:
             fid: 用户ID
-            
+            act: 操作类型（1 关注，2 取消关注）
+
         Returns:
-            是否成功
+            (接口返回的 JSON（包含 code 和 message）, 本次调用是否遇到 412 限流)
         """
         # 测试模式：只模拟操作，不实际执行
         if self.config['settings'].get('test_mode', False):
             time.sleep(0.1)  # 模拟网络延迟
-            return True
+            return {'code': 0, 'message': '0'}, False
         
         url = "https://api.bilibili.com/x/relation/modify"
         data = {
             'fid': fid,
-            'act': 1,  # 1表示关注
+            'act': act,
             'csrf': self.config['cookies']['bili_jct']
         }
         
+        response = self._make_request('POST', url, data=data)
+        return response.json(), response.throttled
+
+    def follow_user(self, fid: int) -> bool:
+        """关注用户
+        
+        Args:
+            fid: 用户ID
+            
+        Returns:
+            是否成功
+        """
         try:
-            response = self._make_request('POST', url, data=data)
-            result = response.json()
+            result, _ = self._modify_relation(fid, RELATION_FOLLOW)
             
             if result['code'] == 0:
                 return True
@@ -197,21 +927,8 @@ class BilibiliAPI:
         Returns:
             是否成功
         """
-        # 测试模式：只模拟操作，不实际执行
-        if self.config['settings'].get('test_mode', False):
-            time.sleep(0.1)  # 模拟网络延迟
-            return True
-        
-        url = "https://api.bilibili.com/x/relation/modify"
-        data = {
-            'fid': fid,
-            'act': 2,  # 2表示取消关注
-            'csrf': self.config['cookies']['bili_jct']
-        }
-        
         try:
-            response = self._make_request('POST', url, data=data)
-            result = response.json()
+            result, _ = self._modify_relation(fid, RELATION_UNFOLLOW)
             
             if result['code'] == 0:
                 return True
@@ -222,16 +939,380 @@ class BilibiliAPI:
         except Exception as e:
             self.logger.error(f"取消关注异常 (用户ID: {fid}): {e}")
             return False
+
+    def modify_relations(self, operations: Iterable[Tuple[int, int]], progress_callback=None) -> Dict:
+        """并发执行一批关系修改操作
+
+        Args:
+            operations: (fid, act) 操作序列
+            progress_callback: 每完成一个操作调用一次，参数为 (fid, 是否成功)
+
+        Returns:
+            RelationExecutor.run 的结果
+        """
+        settings = self.config['settings']
+        executor = RelationExecutor(self, max_window=settings.get('max_concurrent_relations', 4))
+        return executor.run(operations, progress_callback)
     
-    def batch_unfollow_all(self, confirm_callback=None) -> Dict:
+    def get_relations(self, fids: Iterable[int], chunk_size: int = 50) -> Dict[int, int]:
+        """批量查询与指定用户的关系
+
+        Args:
+            fids: 用户ID序列
+            chunk_size: 每次查询包含的用户数
+
+        Returns:
+            {fid: attribute}，0 未关注，1 悄悄关注，2 已关注，6 互相关注，128 已拉黑
+        """
+        url = "https://api.bilibili.com/x/relation/relations"
+        fids = list(dict.fromkeys(fids))
+        relations = {}
+        
+        for i in range(0, len(fids), chunk_size):
+            chunk = fids[i:i + chunk_size]
+            response = self._make_request('GET', url, params={'fids': ','.join(str(fid) for fid in chunk)})
+            data = response.json()
+            
+            if data['code'] != 0:
+                raise Exception(f"查询关系失败: {data['message']}")
+            
+            found = {int(mid): info.get('attribute', 0) for mid, info in (data.get('data') or {}).items()}
+            for fid in chunk:
+                relations[fid] = found.get(fid, 0)
+        
+        return relations
+
+    def filter_unfollowed(self, fids: Iterable[int], following_mids: Optional[Iterable[int]] = None) -> Tuple[List[int], List[int]]:
+        """从待关注列表中剔除已关注的用户
+
+        Args:
+            fids: 待关注的用户ID序列
+            following_mids: 已知的关注用户ID，为空时通过关系接口查询
+
+        Returns:
+            (需要关注的用户ID, 已关注而跳过的用户ID)
+        """
+        fids = list(dict.fromkeys(fids))
+        
+        if following_mids is not None:
+            followed = set(following_mids)
+        else:
+            try:
+                relations = self.get_relations(fids)
+                followed = {fid for fid, attribute in relations.items() if attribute in FOLLOWED_ATTRIBUTES}
+            except Exception as e:
+                self.logger.warning(f"查询关系失败，将关注全部用户: {e}")
+                followed = set()
+        
+        to_follow = [fid for fid in fids if fid not in followed]
+        skipped = [fid for fid in fids if fid in followed]
+        return to_follow, skipped
+
+    def batch_follow(self, fids: Iterable[int], chunk_size: int = 50, progress_callback=None) -> Dict:
+        """使用批量关注接口关注多个用户
+
+        每 chunk_size 个用户合并为一次 /x/relation/batch/modify 请求，
+        批量接口拒绝的分组自动退回为逐个关注。
+
+        Args:
+            fids: 用户ID序列
+            chunk_size: 每次批量请求包含的用户数
+            progress_callback: 每得到一个用户的结果调用一次，参数为 (fid, 是否成功)
+
+        Returns:
+            {'results': {fid: 是否成功}, 'stats': 统计信息}
+        """
+        url = "https://api.bilibili.com/x/relation/batch/modify"
+        fids = list(dict.fromkeys(fids))
+        results = {}
+        rejected = []
+        request_count = 0
+        start_time = time.monotonic()
+        
+        for i in range(0, len(fids), chunk_size):
+            chunk = fids[i:i + chunk_size]
+            
+            if self.config['settings'].get('test_mode', False):
+                time.sleep(0.1)  # 模拟网络延迟
+                result = {'code': 0, 'data': {'failed_fids': []}}
+            else:
+                data = {
+                    'fids': ','.join(str(fid) for fid in chunk),
+                    'act': RELATION_FOLLOW,
+                    're_src': 11,
+                    'csrf': self.config['cookies']['bili_jct']
+                }
+                try:
+                    request_count += 1
+                    result = self._make_request('POST', url, data=data).json()
+                except Exception as e:
+                    self.logger.warning(f"批量关注请求异常，改为逐个关注: {e}")
+                    rejected.extend(chunk)
+                    continue
+            
+            if result.get('code') != 0:
+                self.logger.warning(f"批量关注被拒绝，改为逐个关注: {result.get('message')}")
+                rejected.extend(chunk)
+                continue
+            
+            failed_fids = {int(fid) for fid in (result.get('data') or {}).get('failed_fids') or []}
+            for fid in chunk:
+                results[fid] = fid not in failed_fids
+                if progress_callback:
+                    progress_callback(fid, results[fid])
+        
+        if rejected:
+            outcome = self.modify_relations(((fid, RELATION_FOLLOW) for fid in rejected), progress_callback)
+            results.update(outcome['results'])
+            request_count += len(rejected)
+        
+        success_count = sum(1 for ok in results.values() if ok)
+        stats = {
+            'total': len(results),
+            'success': success_count,
+            'failed': len(results) - success_count,
+            'fallback': len(rejected),
+            'requests': request_count,
+            'elapsed': time.monotonic() - start_time,
+        }
+        self.logger.info(f"批量关注完成! 总计: {stats['total']}, 成功: {success_count}, 请求数: {request_count}")
+        return {'results': results, 'stats': stats}
+    
+    def _record_relation(self, fid: int, act: int, user: Optional[FollowingUser] = None):
+        """把成功的关注或取消关注写入本地存储，使缓存的关注列表和 total 与服务器一致
+
+        Args:
+            fid: 用户ID
+            act: 操作类型（1 关注，2 取消关注）
+            user: 关注时写入的用户数据，为空时只记录UID和关注时间
+        """
+        try:
+            if act == RELATION_UNFOLLOW:
+                self.store.remove_users(self.owner, [fid])
+            elif act == RELATION_FOLLOW and self.has_following_snapshot():
+                # 没有完整快照时不写入，避免启动时只显示新关注的几个用户
+                self.store.add_users(self.owner, [user or FollowingUser(fid, mtime=int(time.time()))])
+        except Exception as e:
+            self.logger.warning(f"更新本地关注列表失败 (用户ID: {fid}): {e}")
+
+    def start_job(self, act: int, fids: Iterable[int], description: str = '') -> str:
+        """在任务日志中创建批量任务
+
+        Args:
+            act: 操作类型（1 关注，2 取消关注）
+            fids: 计划操作的用户ID
+            description: 任务说明
+
+        Returns:
+            任务ID
+        """
+        return self.journal.create_job(act, fids, description, owner=self.owner)
+
+    def run_job(self, job_id: str, progress_callback=None,
+                users: Optional[Dict[int, FollowingUser]] = None) -> Dict:
+        """执行或继续执行任务日志中的批量任务，只处理尚无结果的用户
+
+        每个成功的操作同时写入本地存储。
+
+        Args:
+            job_id: 任务ID
+            progress_callback: 每完成一个操作调用一次，参数为 (fid, 是否成功)
+            users: {fid: 用户数据}，关注成功时写入本地存储
+
+        Returns:
+            本次执行的 {'results': ..., 'stats': ...}
+        """
+        job = self.journal.get_job(job_id, self.owner)
+        if job is None:
+            raise ValueError(f"任务 {job_id} 不存在或已完成")
+        
+        def on_progress(fid, success):
+            self.journal.record(job_id, fid, success)
+            if success:
+                self._record_relation(fid, job['act'], (users or {}).get(fid))
+            if progress_callback:
+                progress_callback(fid, success)
+        
+        if job['open']:
+            # 上次读取关注列表中途失败，重新读取尚未取消关注的用户
+            self.logger.info(f"继续执行任务 {job_id}，重新读取关注列表")
+            return self._run_unfollow_pipeline(job_id, progress_callback=progress_callback)
+        
+        remaining = job['remaining']
+        if job['results']:
+            self.logger.info(f"继续执行任务 {job_id}，剩余 {len(remaining)} 个操作")
+        
+        if job['act'] == RELATION_FOLLOW:
+            outcome = self.batch_follow(remaining, progress_callback=on_progress)
+        else:
+            outcome = self.modify_relations(((fid, job['act']) for fid in remaining), on_progress)
+        
+        self.journal.finish(job_id)
+        return outcome
+
+    def pending_jobs(self) -> List[Dict]:
+        """获取当前账号中途退出、尚未完成的批量任务"""
+        return self.journal.pending_jobs(self.owner)
+    
+    def _iter_pages_for_removal(self, first_page: Dict, ps: int) -> Iterator[List[FollowingUser]]:
+        """从最后一页倒序产出关注列表
+
+        取消关注靠后的用户不会让尚未读取的靠前页发生位移，
+        因此可以一边读取一边取消关注。第一页已经读取过，最后产出。
+        """
+        last_pn = max(1, -(-first_page.get('total', 0) // ps))
+        for pn in range(last_pn, 1, -1):
+            yield self._format_users(self.get_following_list(pn, ps).get('list', []))
+        yield self._format_users(first_page.get('list', []))
+
+    def _batch_unfollow_pipelined(self, confirm_callback=None) -> Dict:
+        """流水线方式批量取消所有关注
+
+        生产者线程逐页读取关注列表放入有界队列，取消关注的工作线程同时消费，
+        读取与取消关注共用同一个限流器。
+        """
+        settings = self.config['settings']
+        ps = settings['batch_size']
+        
+        try:
+            first_page = self.get_following_list(1, ps)
+        except Exception as e:
+            self.logger.error(f"获取关注列表失败: {e}")
+            return {'total': 0, 'success': 0, 'failed': 0}
+        
+        if not first_page.get('list'):
+            return {'total': 0, 'success': 0, 'failed': 0}
+        
+        total_count = first_page.get('total', 0)
+        is_test_mode = settings.get('test_mode', False)
+        
+        # 测试模式限制操作数量（内部逻辑，用户不感知）
+        if is_test_mode:
+            total_count = min(total_count, settings.get('max_test_operations', 5))
+            self.logger.debug(f"测试模式：限制操作数量为 {total_count}")
+        
+        # 确认操作
+        if confirm_callback and not confirm_callback(total_count):
+            self.logger.info("用户取消操作")
+            return {'total': total_count, 'success': 0, 'failed': 0, 'cancelled': True}
+        
+        self.logger.info(f"开始批量取消关注，共 {total_count} 个用户")
+        
+        # 计划随读取逐页追加，读完全部列表前任务一直保持可恢复
+        job_id = self.journal.create_job(RELATION_UNFOLLOW, [], '取消全部关注', open_plan=True, owner=self.owner)
+        outcome = self._run_unfollow_pipeline(job_id, first_page)
+        stats = outcome['stats']
+        
+        result = {
+            'total': stats['total'],
+            'success': stats['success'],
+            'failed': stats['failed'],
+            'test_mode': is_test_mode
+        }
+        if outcome.get('incomplete'):
+            result['incomplete'] = True
+            result['job_id'] = job_id
+            self.logger.warning(f"读取关注列表中途失败，已完成 {stats['total']} 个操作，"
+                                f"任务 {job_id} 已保存，可稍后恢复")
+            return result
+        
+        self.logger.info(f"批量取消关注完成! 总计: {stats['total']}, 成功: {stats['success']}, 失败: {stats['failed']}")
+        return result
+
+    def _run_unfollow_pipeline(self, job_id: str, first_page: Optional[Dict] = None,
+                               limit: Optional[int] = None, progress_callback=None) -> Dict:
+        """边读取关注列表边取消关注，计划逐页追加到任务日志
+
+        读取列表失败时不结束任务，返回结果中带有 incomplete，之后可通过 run_job 恢复。
+
+        Args:
+            job_id: 以 open_plan 方式创建的任务ID
+            first_page: 已读取的第一页，为 None 时重新读取
+            limit: 最多操作的数量（测试模式）
+            progress_callback: 每完成一个操作调用一次，参数为 (fid, 是否成功)
+
+        Returns:
+            {'results': ..., 'stats': ...}，列表未读完时带有 'incomplete': True
+        """
+        settings = self.config['settings']
+        ps = settings['batch_size']
+        if limit is None and settings.get('test_mode', False):
+            limit = settings.get('max_test_operations', 5)
+        
+        work = queue.Queue(maxsize=settings.get('pipeline_queue_size', ps * 2))
+        unames = {}
+        read_error = None
+        total_count = limit or (first_page or {}).get('total', 0)
+        
+        def produce():
+            nonlocal read_error, total_count
+            produced = 0
+            try:
+                page_one = first_page if first_page is not None else self.get_following_list(1, ps)
+                total_count = limit or page_one.get('total', 0)
+                for page in self._iter_pages_for_removal(page_one, ps):
+                    if limit is not None:
+                        page = page[:limit - produced]
+                    if not page:
+                        continue
+                    self.journal.extend_plan(job_id, [user.mid for user in page])
+                    for user in page:
+                        unames[user.mid] = user.uname
+                        work.put((user.mid, RELATION_UNFOLLOW))
+                    produced += len(page)
+                self.journal.close_plan(job_id)
+            except Exception as e:
+                read_error = e
+                self.logger.error(f"获取关注列表失败: {e}")
+            finally:
+                work.put(None)
+        
+        def consume():
+            while (operation := work.get()) is not None:
+                yield operation
+        
+        done_count = 0
+        
+        def on_progress(fid, success):
+            nonlocal done_count
+            done_count += 1
+            self.journal.record(job_id, fid, success)
+            if success:
+                self._record_relation(fid, RELATION_UNFOLLOW)
+                self.logger.info(f"[{done_count}/{total_count}] ✓ 成功取消关注: {unames[fid]} (ID: {fid})")
+            else:
+                self.logger.error(f"[{done_count}/{total_count}] ✗ 取消关注失败: {unames[fid]} (ID: {fid})")
+            if progress_callback:
+                progress_callback(fid, success)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        outcome = self.modify_relations(consume(), on_progress)
+        producer.join()
+        
+        if read_error is not None:
+            # 未读取的页没有写入计划，保留任务以便恢复
+            outcome['incomplete'] = True
+            return outcome
+        
+        self.journal.finish(job_id)
+        return outcome
+
+    def batch_unfollow_all(self, confirm_callback=None, pipelined: Optional[bool] = None) -> Dict:
         """批量取消所有关注
         
         Args:
             confirm_callback: 确认回调函数
+            pipelined: 是否边读取列表边取消关注，默认读取配置 pipelined_unfollow
             
         Returns:
             操作结果统计
         """
+        if pipelined is None:
+            pipelined = self.config['settings'].get('pipelined_unfollow', True)
+        if pipelined:
+            return self._batch_unfollow_pipelined(confirm_callback)
+        
         # 获取所有关注用户
         all_following = self.get_all_following()
         
@@ -258,39 +1339,29 @@ class BilibiliAPI:
         
         self.logger.info(f"开始批量取消关注，共 {total_count} 个用户")
         
-        success_count = 0
-        failed_count = 0
-        delay = self.config['settings']['delay_between_requests']
-        
-        # 测试模式下减少延迟
-        if is_test_mode:
-            delay = min(delay, 0.2)
+        unames = {user.mid: user.uname for user in all_following}
+        done_count = 0
         
-        for i, user in enumerate(all_following, 1):
-            fid = user['mid']
-            uname = user['uname']
-            
-            self.logger.info(f"[{i}/{total_count}] 正在取消关注: {uname} (ID: {fid})")
-            
-            if self.unfollow_user(fid):
-                success_count += 1
-                self.logger.info(f"✓ 成功取消关注: {uname}")
+        def on_progress(fid, success):
+            nonlocal done_count
+            done_count += 1
+            if success:
+                self.logger.info(f"[{done_count}/{total_count}] ✓ 成功取消关注: {unames[fid]} (ID: {fid})")
             else:
-                failed_count += 1
-                self.logger.error(f"✗ 取消关注失败: {uname}")
-            
-            # 延迟以避免请求过快
-            if i < total_count:
-                time.sleep(delay)
+                self.logger.error(f"[{done_count}/{total_count}] ✗ 取消关注失败: {unames[fid]} (ID: {fid})")
+        
+        job_id = self.start_job(RELATION_UNFOLLOW, unames, '取消全部关注')
+        outcome = self.run_job(job_id, on_progress)
+        stats = outcome['stats']
         
         result = {
             'total': total_count,
-            'success': success_count,
-            'failed': failed_count,
+            'success': stats['success'],
+            'failed': stats['failed'],
             'test_mode': is_test_mode
         }
         
-        self.logger.info(f"批量取消关注完成! 总计: {total_count}, 成功: {success_count}, 失败: {failed_count}")
+        self.logger.info(f"批量取消关注完成! 总计: {total_count}, 成功: {stats['success']}, 失败: {stats['failed']}")
         return result
     
     def get_user_info(self) -> Dict:
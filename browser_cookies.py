@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import base64
+import glob
+import hashlib
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+LOGIN_COOKIE_NAMES = ['SESSDATA', 'bili_jct', 'DedeUserID', 'DedeUserID__ckMd5']
+
+# Chrome 的时间戳从 1601-01-01 起按微秒计
+CHROME_EPOCH_OFFSET = 11644473600
+
+
+def _bilibili_host(column: str) -> str:
+    """只匹配 bilibili.com 及其子域名（含前导点的写法），不匹配 evilbilibili.com"""
+    return f"({column} = 'bilibili.com' OR {column} LIKE '%.bilibili.com')"
+
+
+def _home(*parts: str) -> str:
+    return os.path.join(os.path.expanduser('~'), *parts)
+
+
+def _firefox_profile_roots() -> List[str]:
+    if sys.platform == 'win32':
+        return [os.path.join(os.environ.get('APPDATA', ''), 'Mozilla', 'Firefox', 'Profiles')]
+    if sys.platform == 'darwin':
+        return [_home('Library', 'Application Support', 'Firefox', 'Profiles')]
+    return [_home('.mozilla', 'firefox'), _home('snap', 'firefox', 'common', '.mozilla', 'firefox')]
+
+
+def _chrome_user_data_dirs() -> List[str]:
+    if sys.platform == 'win32':
+        local = os.environ.get('LOCALAPPDATA', '')
+        return [os.path.join(local, 'Google', 'Chrome', 'User Data'),
+                os.path.join(local, 'Microsoft', 'Edge', 'User Data'),
+                os.path.join(local, 'Chromium', 'User Data')]
+    if sys.platform == 'darwin':
+        return [_home('Library', 'Application Support', 'Google', 'Chrome'),
+                _home('Library', 'Application Support', 'Microsoft Edge'),
+                _home('Library', 'Application Support', 'Chromium')]
+    return [_home('.config', 'google-chrome'), _home('.config', 'microsoft-edge'), _home('.config', 'chromium')]
+
+
+def find_cookie_databases(browser: Optional[str] = None) -> List[Tuple[str, str]]:
+    """查找本机浏览器的 Cookie 数据库
+
+    Args:
+        browser: 'firefox' 或 'chrome'，为 None 时查找全部
+
+    Returns:
+        [(浏览器类型, 数据库路径)]，最近修改的在前
+    """
+    found = []
+    if browser in (None, 'firefox'):
+        for root in _firefox_profile_roots():
+            found += [('firefox', path) for path in glob.glob(os.path.join(root, '*', 'cookies.sqlite'))]
+    if browser in (None, 'chrome'):
+        for root in _chrome_user_data_dirs():
+            for pattern in ('*/Network/Cookies', '*/Cookies'):
+                found += [('chrome', path) for path in glob.glob(os.path.join(root, pattern))]
+    return sorted(found, key=lambda item: os.path.getmtime(item[1]), reverse=True)
+
+
+def _query(db_path: str, sql: str) -> List[tuple]:
+    """只读查询 Cookie 数据库
+
+    先以 immutable 方式直接读取，不受浏览器运行时的锁影响；
+    文件被独占锁定或有未合并的 WAL 时，复制到临时目录后再读。
+    """
+    wal_path = db_path + '-wal'
+    if not (os.path.exists(wal_path) and os.path.getsize(wal_path) > 0):
+        try:
+            conn = sqlite3.connect(f'file:{quote(os.path.abspath(db_path))}?mode=ro&immutable=1', uri=True)
+            try:
+                return conn.execute(sql).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = os.path.join(tmp_dir, 'cookies.sqlite')
+        shutil.copyfile(db_path, tmp_path)
+        if os.path.exists(wal_path):
+            shutil.copyfile(wal_path, tmp_path + '-wal')
+        conn = sqlite3.connect(tmp_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+
+def _pick_latest(rows: List[tuple]) -> Dict:
+    """同名 Cookie 只保留过期时间最晚的一个，rows 为 (name, value, 过期时间秒)"""
+    now = time.time()
+    cookies = {}
+    expiries = {}
+    for name, value, expiry in rows:
+        if not value or (expiry and expiry < now):
+            continue
+        if name not in cookies or (expiry or float('inf')) > expiries[name]:
+            cookies[name] = value
+            expiries[name] = expiry or float('inf')
+    return cookies
+
+
+def read_firefox_cookies(db_path: str) -> Dict:
+    """读取 Firefox 中B站的登录 Cookie（Firefox 不加密 Cookie）"""
+    names = ', '.join(f"'{name}'" for name in LOGIN_COOKIE_NAMES)
+    rows = _query(db_path, f"SELECT name, value, expiry FROM moz_cookies "
+                           f"WHERE {_bilibili_host('host')} AND name IN ({names})")
+    # 新版 Firefox 的 expiry 以毫秒计
+    return _pick_latest([(name, value, expiry / 1000 if expiry > 10 ** 11 else expiry)
+                         for name, value, expiry in rows])
+
+
+def _chrome_key_linux(version: bytes) -> bytes:
+    password = b'peanuts'
+    if version == b'v11':
+        try:
+            import secretstorage
+        except ImportError:
+            raise Exception("读取 Chrome Cookie 需要安装 secretstorage：pip install secretstorage")
+        connection = secretstorage.dbus_init()
+        collection = secretstorage.get_default_collection(connection)
+        for item in collection.get_all_items():
+            if item.get_label() in ('Chrome Safe Storage', 'Chromium Safe Storage'):
+                password = item.get_secret()
+                break
+    return hashlib.pbkdf2_hmac('sha1', password, b'saltysalt', 1, 16)
+
+
+def _chrome_key_macos() -> bytes:
+    password = subprocess.run(['security', 'find-generic-password', '-w', '-s', 'Chrome Safe Storage'],
+                              capture_output=True, check=True).stdout.strip()
+    return hashlib.pbkdf2_hmac('sha1', password, b'saltysalt', 1003, 16)
+
+
+def _dpapi_decrypt(data: bytes) -> bytes:
+    """调用 Windows DPAPI 解密"""
+    import ctypes
+    from ctypes import wintypes
+
+    class DataBlob(ctypes.Structure):
+        _fields_ = [('cbData', wintypes.DWORD), ('pbData', ctypes.POINTER(ctypes.c_char))]
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DataBlob()
+    if not ctypes.windll.crypt32.CryptUnprotectData(ctypes.byref(blob_in), None, None, None, None, 0,
+                                                    ctypes.byref(blob_out)):
+        raise OSError("DPAPI 解密失败")
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+
+def _chrome_key_windows(db_path: str) -> bytes:
+    """从 User Data/Local State 中读取并解密 Cookie 密钥"""
+    import json
+
+    directory = os.path.dirname(db_path)
+    while not os.path.exists(os.path.join(directory, 'Local State')):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            raise Exception("找不到 Local State 文件")
+        directory = parent
+    with open(os.path.join(directory, 'Local State'), 'r', encoding='utf-8') as f:
+        encrypted_key = base64.b64decode(json.load(f)['os_crypt']['encrypted_key'])
+    return _dpapi_decrypt(encrypted_key[len(b'DPAPI'):])
+
+
+def decrypt_chrome_value(encrypted_value: bytes, key_provider: Callable[[bytes], bytes]) -> str:
+    """解密 Chrome 的 encrypted_value
+
+    Args:
+        encrypted_value: 数据库中的加密值，以 v10/v11 开头
+        key_provider: 根据版本前缀返回密钥
+    """
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise Exception("读取 Chrome Cookie 需要安装 cryptography：pip install cryptography")
+
+    version, payload = encrypted_value[:3], encrypted_value[3:]
+    if version not in (b'v10', b'v11'):
+        raise Exception(f"不支持的 Cookie 加密版本: {version!r}")
+    key = key_provider(version)
+
+    if len(key) == 32:
+        # Windows：AES-256-GCM，12 字节 nonce 在前，16 字节 tag 在后
+        return AESGCM(key).decrypt(payload[:12], payload[12:], None)
+
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(b' ' * 16)).decryptor()
+    padded = decryptor.update(payload) + decryptor.finalize()
+    return padded[:-padded[-1]]
+
+
+def read_chrome_cookies(db_path: str, key_provider: Optional[Callable[[bytes], bytes]] = None) -> Dict:
+    """读取 Chrome（及 Edge、Chromium）中B站的登录 Cookie
+
+    Args:
+        db_path: Cookies 数据库路径
+        key_provider: 根据版本前缀（v10/v11）返回密钥，默认按当前系统获取
+    """
+    if key_provider is None:
+        keys = {}
+
+        def key_provider(version: bytes) -> bytes:
+            if version not in keys:
+                if sys.platform == 'win32':
+                    keys[version] = _chrome_key_windows(db_path)
+                elif sys.platform == 'darwin':
+                    keys[version] = _chrome_key_macos()
+                else:
+                    keys[version] = _chrome_key_linux(version)
+            return keys[version]
+
+    names = ', '.join(f"'{name}'" for name in LOGIN_COOKIE_NAMES)
+    rows = _query(db_path, f"SELECT name, value, encrypted_value, expires_utc FROM cookies "
+                           f"WHERE {_bilibili_host('host_key')} AND name IN ({names})")
+    meta = dict(_query(db_path, "SELECT key, value FROM meta"))
+    # 数据库版本 24 起，解密后的值前面带有 32 字节的域名哈希
+    hash_prefix = 32 if int(meta.get('version', 0)) >= 24 else 0
+
+    decrypted = []
+    for name, value, encrypted_value, expires_utc in rows:
+        if not value and encrypted_value:
+            value = decrypt_chrome_value(encrypted_value, key_provider)[hash_prefix:].decode('utf-8')
+        expiry = expires_utc / 1000000 - CHROME_EPOCH_OFFSET if expires_utc else 0
+        decrypted.append((name, value, expiry))
+    return _pick_latest(decrypted)
+
+
+def import_browser_cookies(browser: Optional[str] = None) -> Optional[Dict]:
+    """从本机浏览器中读取B站登录 Cookie
+
+    Args:
+        browser: 'firefox' 或 'chrome'，为 None 时依次尝试全部浏览器
+
+    Returns:
+        登录凭据，没有找到已登录的浏览器时返回 None
+    """
+    for browser_type, db_path in find_cookie_databases(browser):
+        try:
+            if browser_type == 'firefox':
+                cookies = read_firefox_cookies(db_path)
+            else:
+                cookies = read_chrome_cookies(db_path)
+        except Exception as e:
+            print(f"读取 {db_path} 失败: {e}")
+            continue
+        if all(name in cookies for name in ('SESSDATA', 'bili_jct', 'DedeUserID')):
+            print(f"已从 {db_path} 读取登录信息")
+            return cookies
+    return None
+
+
+def browser_cookie_login_setup(browser: Optional[str] = None) -> bool:
+    """从本机浏览器导入登录信息，并写入配置文件"""
+    from auto_login import BilibiliAutoLogin
+
+    cookies = import_browser_cookies(browser)
+    if not cookies:
+        print("没有在本机浏览器中找到B站登录信息，请先在浏览器中登录B站")
+        return False
+
+    if BilibiliAutoLogin().create_config_file(cookies):
+        print("登录成功！")
+        return True
+    else:
+        print("登录失败")
+        return False
+
+
+if __name__ == "__main__":
+    browser_cookie_login_setup(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,12 +1,29 @@
-import copy
-import json
-from typing import Dict, List, Iterable, Generator
+import argparse
+from typing import TYPE_CHECKING, Dict, List, Iterable, Generator
 
-from bilibili_api import BilibiliAPI
 import sys
 import os
-import time
-api = BilibiliAPI()
+
+if TYPE_CHECKING:
+    from bilibili_api import BilibiliAPI
+    from following_user import FollowingUser
+
+_api: 'BilibiliAPI | None' = None
+
+
+def get_api() -> 'BilibiliAPI':
+    """首次使用时再创建 API 客户端，避免导入本模块时读取配置和加载 requests"""
+    global _api
+    if _api is None:
+        from bilibili_api import BilibiliAPI
+        _api = BilibiliAPI()
+    return _api
+
+
+def reset_api() -> None:
+    """配置文件更新后丢弃旧的 API 客户端"""
+    global _api
+    _api = None
 
 
 def get_app_dir():
@@ -19,7 +36,7 @@ def get_app_dir():
         return os.path.dirname(os.path.abspath(__file__))
 
 def welcome_back(user_info) -> None:
-    user_info = api.get_user_info()
+    user_info = get_api().get_user_info()
     print("已登录")
     print(f"👋 欢迎回来，{user_info.get('uname', '未知')} (ID: {user_info.get('mid', '未知')})")
     print("✅ 登录成功，可以开始使用了")
@@ -28,7 +45,7 @@ def check_config() -> Dict | None:
     config_path = os.path.join(get_app_dir(), 'config.json')
     if os.path.exists(config_path):
         try:
-            user_info = api.get_user_info()
+            user_info = get_api().get_user_info()
             if user_info:
                 return user_info
             else:
@@ -38,60 +55,104 @@ def check_config() -> Dict | None:
     else:
         print("💡 首次使用？登录吧")
 
-def generate_newpipe_data(following_list_generator: Iterable[Dict]) -> Dict:
-    result = {
-        "app_version": "4.7.2",
-        "app_version_int": 108500,
-        "subscriptions": []
-    }
-
+def generate_newpipe_data(following_list_generator: Iterable['FollowingUser']) -> Generator[Dict]:
+    """将关注用户逐个转换为 NewPipe 订阅条目"""
+    from export_pipeline import newpipe_subscription
     for user in following_list_generator:
-        user_with_newpipe_fields = copy.deepcopy(user)
-        mid = user.get('mid')
-        uname = user.get('uname')
-        if mid and uname:
-            result['subscriptions'].append({
-                "service_id": 5,
-                "url": f"https://space.bilibili.com/{mid}",
-                "name": uname
-            })
-    return result
-
-def get_all_following() -> Generator[Dict]:
+        subscription = newpipe_subscription(user)
+        if subscription:
+            yield subscription
+
+def get_all_following(offline: bool = False, keep_raw: bool | None = None) -> Generator['FollowingUser']:
+    """逐个产出关注用户
+
+    Args:
+        offline: 只读取本地保存的关注列表
+        keep_raw: 是否保留接口返回的完整数据，为 None 时读取配置 keep_raw_user_data
+    """
+    if offline:
+        print("📂 正在读取本地保存的关注列表...")
+        yield from get_api().iter_cached_following(keep_raw=keep_raw)
+        return
+
     print("🔄 正在获取关注列表...")
-    yield from api.get_all_following()
-
-def export_list():
-    bilibili_data = list(get_all_following())
-    newpipe_data = generate_newpipe_data(bilibili_data)
-    localtime = time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime())
-    filename_raw = f"bilibili_following_{localtime}_{len(bilibili_data)}_raw.json"
-
-    # Example: newpipe_subscriptions_202509061543.json
-    localtime = time.strftime("%Y%m%d%H%M", time.localtime())
-    filename_newpipe = f"newpipe_subscriptions_{localtime}.json"
-    # 将文件保存到应用程序目录
-    file_path = os.path.join(get_app_dir(), filename_raw)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(filename_raw, f, indent=2, ensure_ascii=False)
-    print("🎉 成功", f"关注列表已导出到:\n{file_path}\n\n📊 已导出 {len(filename_raw)} 个用户的重要信息")
-
-    file_path = os.path.join(get_app_dir(), filename_newpipe)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(newpipe_data, f, ensure_ascii=False)
-    print("🎉 成功", f"关注列表已导出到:\n{file_path}\n\n📊 已导出 {len(filename_newpipe)} 个用户的重要信息")
-
-
-def main() -> None:
-    from auto_login import auto_login_setup
+    if get_api().has_following_snapshot():
+        # 已有快照时增量同步，通常只需一两次请求
+        yield from get_api().sync_following(keep_raw)
+    else:
+        yield from get_api().iter_following(keep_raw)
+
+DEFAULT_EXPORT_FORMATS = ['raw', 'newpipe']
+
+def export_list(offline: bool = False, formats: List[str] | None = None, compress: bool = False):
+    """导出关注列表，所有格式在一次遍历中边获取边写入"""
+    from export_pipeline import RAW_FORMATS, export_users
+
+    formats = formats or DEFAULT_EXPORT_FORMATS
+    # raw、ndjson 导出完整的接口数据，只在导出时保留原始数据
+    keep_raw = bool(RAW_FORMATS.intersection(formats)) or None
+    results = export_users(get_all_following(offline, keep_raw), formats, get_app_dir(), compress=compress)
+    for result in results.values():
+        print("🎉 成功", f"关注列表已导出到:\n{result['path']}\n\n📊 已导出 {result['count']} 个用户的重要信息")
+
+
+def resume_jobs(job_id: str | None = None) -> None:
+    """继续执行当前账号中途退出的批量任务，其他账号的任务不会恢复"""
+    pending_jobs = get_api().pending_jobs()
+    if job_id:
+        pending_jobs = [job for job in pending_jobs if job['job_id'] == job_id]
+    if not pending_jobs:
+        print(f"💡 账号 {get_api().owner} 没有需要恢复的任务")
+        return
+
+    for job in pending_jobs:
+        print(f"▶️ 继续账号 {job['owner']} 的任务 {job['job_id']}：{job['description']}（已完成 {len(job['results'])} 个，剩余 {len(job['remaining'])} 个）")
+        outcome = get_api().run_job(job['job_id'])
+        stats = outcome['stats']
+        if outcome.get('incomplete'):
+            print(f"⚠️ 读取关注列表失败，任务未完成：成功 {stats['success']} 个，失败 {stats['failed']} 个，可稍后再次恢复")
+        else:
+            print(f"✅ 任务已完成！成功 {stats['success']} 个，失败 {stats['failed']} 个")
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    from export_pipeline import EXPORT_FORMATS
+
+    parser = argparse.ArgumentParser(description="B站关注管理器命令行工具")
+    parser.add_argument("--login", choices=["qr", "browser", "cookies"], default="qr",
+                        help="未登录时的登录方式：qr 终端扫码（默认），browser 打开浏览器，cookies 从本机浏览器导入")
+    subparsers = parser.add_subparsers(dest="command")
+    export_parser = subparsers.add_parser("export", help="导出关注列表（默认）")
+    export_parser.add_argument("--offline", action="store_true", help="直接导出本地保存的关注列表，不联网")
+    export_parser.add_argument("--format", dest="formats", action="append", choices=EXPORT_FORMATS,
+                               help="导出格式，可重复指定：raw、ndjson、csv、simplified、newpipe（默认 raw 和 newpipe）")
+    export_parser.add_argument("--gzip", action="store_true", help="使用 gzip 压缩导出文件")
+    resume_parser = subparsers.add_parser("resume", help="继续执行中途退出的批量任务")
+    resume_parser.add_argument("job_id", nargs="?", help="任务ID，默认恢复全部未完成任务")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.command == "export" and args.offline:
+        export_list(offline=True, formats=args.formats, compress=args.gzip)
+        return
+
     user_info = check_config()
     if user_info:
         welcome_back(user_info)
     else:
-        auto_login_setup()
+        from auto_login import auto_login_setup
+        auto_login_setup(args.login)
+        reset_api()
     assert check_config(), "登录失败，无法继续"
 
-    export_list()
+    if args.command == "resume":
+        resume_jobs(args.job_id)
+    elif args.command == "export":
+        export_list(formats=args.formats, compress=args.gzip)
+    else:
+        export_list()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""关注列表的流式导出
+
+用户逐个从 API 或本地数据库读出后直接写入各格式的文件，不在内存中构建完整列表；
+多种格式在一次遍历中同时写出，可选 gzip 压缩。
+
+支持的格式：
+- raw：接口返回的完整用户数据，JSON 数组
+- ndjson：同 raw，每行一个用户
+- csv：简化字段
+- simplified：简化字段（中文字段名），JSON 数组
+- newpipe：NewPipe 订阅文件
+"""
+
+import csv
+import gzip
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+from following_user import FollowingUser
+
+NEWPIPE_HEADER = {
+    "app_version": "4.7.2",
+    "app_version_int": 108500,
+}
+
+# NewPipe 中B站的 service_id
+NEWPIPE_BILIBILI_SERVICE = 5
+
+SIMPLIFIED_FIELDS = ['用户名', 'UID', '关注时间', '关注时间戳', '签名', '官方认证', '头像链接']
+
+EXPORT_FORMATS = ['raw', 'ndjson', 'csv', 'simplified', 'newpipe']
+
+# 需要完整原始数据的格式，导出它们时读取的用户应保留原始数据
+RAW_FORMATS = {'raw', 'ndjson'}
+
+
+def simplify_user(user: FollowingUser) -> Dict:
+    """只保留重要的数据字段"""
+    return {
+        '用户名': user.uname or '未知',
+        'UID': user.mid,
+        '关注时间': user.mtime_str,
+        '关注时间戳': user.mtime or '',
+        '签名': user.sign.strip() or '暂无签名',
+        '官方认证': user.official_desc,
+        '头像链接': user.face
+    }
+
+
+def newpipe_subscription(user: FollowingUser) -> Optional[Dict]:
+    """将关注用户转换为 NewPipe 订阅条目，缺少 UID 或用户名时返回 None"""
+    if not (user.mid and user.uname):
+        return None
+    return {
+        "service_id": NEWPIPE_BILIBILI_SERVICE,
+        "url": f"https://space.bilibili.com/{user.mid}",
+        "name": user.uname
+    }
+
+
+class JSONArrayWriter:
+    """逐个写入 JSON 数组的元素"""
+
+    def __init__(self, f: TextIO, transform: Callable[[FollowingUser], Optional[Dict]] = FollowingUser.to_dict,
+                 prefix: str = '[\n', suffix: str = '\n]', separator: str = ',\n'):
+        self.f = f
+        self.transform = transform
+        self.suffix = suffix
+        self.separator = separator
+        self.count = 0
+        f.write(prefix)
+
+    def write(self, user: FollowingUser):
+        item = self.transform(user)
+        if item is None:
+            return
+        if self.count:
+            self.f.write(self.separator)
+        self.f.write(json.dumps(item, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        self.f.write(self.suffix)
+
+
+class NDJSONWriter:
+    """每行写入一个用户"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.count = 0
+
+    def write(self, user: FollowingUser):
+        self.f.write(json.dumps(user.to_dict(), ensure_ascii=False))
+        self.f.write('\n')
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class CSVWriter:
+    """以简化字段写入 CSV"""
+
+    def __init__(self, f: TextIO):
+        self.writer = csv.DictWriter(f, fieldnames=SIMPLIFIED_FIELDS)
+        self.writer.writeheader()
+        self.count = 0
+
+    def write(self, user: FollowingUser):
+        self.writer.writerow(simplify_user(user))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+def newpipe_writer(f: TextIO) -> JSONArrayWriter:
+    prefix = json.dumps(NEWPIPE_HEADER, ensure_ascii=False)[:-1] + ', "subscriptions": ['
+    return JSONArrayWriter(f, newpipe_subscription, prefix=prefix, suffix=']}', separator=', ')
+
+
+WRITERS = {
+    'raw': JSONArrayWriter,
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'simplified': lambda f: JSONArrayWriter(f, simplify_user),
+    'newpipe': newpipe_writer,
+}
+
+
+def export_filename(export_format: str, count: int, compress: bool = False,
+                    now: Optional[time.struct_time] = None) -> str:
+    """导出文件名，包含导出时间和用户数量
+
+    Example: bilibili_following_2025-09-06-15-43-00_120_raw.json、newpipe_subscriptions_202509061543.json
+    """
+    now = now or time.localtime()
+    if export_format == 'newpipe':
+        filename = f"newpipe_subscriptions_{time.strftime('%Y%m%d%H%M', now)}.json"
+    else:
+        localtime = time.strftime("%Y-%m-%d-%H-%M-%S", now)
+        suffix = {
+            'raw': 'raw.json',
+            'ndjson': 'raw.ndjson',
+            'csv': 'users.csv',
+            'simplified': 'users.json',
+        }[export_format]
+        filename = f"bilibili_following_{localtime}_{count}_{suffix}"
+    return filename + '.gz' if compress else filename
+
+
+def _open_output(path: str, compress: bool) -> TextIO:
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_users(users: Iterable[FollowingUser], formats: List[str], directory: str,
+                 compress: bool = False) -> Dict[str, Dict]:
+    """一次遍历把用户写入多种格式的文件
+
+    总数在遍历完成前未知，先写入临时文件，完成后再按用户数量重命名。
+
+    Args:
+        users: 用户数据，可以是边获取边返回的生成器
+        formats: 导出格式，可选 raw、ndjson、csv、simplified、newpipe
+        directory: 导出目录
+        compress: 是否使用 gzip 压缩
+
+    Returns:
+        {格式: {'path': 文件路径, 'count': 写入条目数}}
+    """
+    for export_format in formats:
+        if export_format not in WRITERS:
+            raise ValueError(f"不支持的导出格式: {export_format}")
+
+    now = time.localtime()
+    files = {}
+    writers = {}
+    try:
+        for export_format in dict.fromkeys(formats):
+            tmp_path = os.path.join(directory, export_filename(export_format, 0, compress, now) + '.part')
+            files[export_format] = (_open_output(tmp_path, compress), tmp_path)
+            writers[export_format] = WRITERS[export_format](files[export_format][0])
+
+        # 边获取边写入，无需等待整个列表下载完成
+        for user in users:
+            for writer in writers.values():
+                writer.write(user)
+
+        for writer in writers.values():
+            writer.close()
+    except BaseException:
+        for f, tmp_path in files.values():
+            f.close()
+            os.remove(tmp_path)
+        raise
+
+    results = {}
+    for export_format, (f, tmp_path) in files.items():
+        f.close()
+        count = writers[export_format].count
+        path = os.path.join(directory, export_filename(export_format, count, compress, now))
+        os.replace(tmp_path, path)
+        results[export_format] = {'path': path, 'count': count}
+    return results
@@ -0,0 +1,228 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from following_user import FollowingUser
+
+# 允许排序的列，防止拼接任意 SQL
+SORT_COLUMNS = {
+    'position': 'position ASC',
+    'mtime': 'mtime DESC',
+    'uname': 'uname COLLATE NOCASE ASC',
+    'mid': 'mid ASC',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS following (
+    owner TEXT NOT NULL,
+    mid INTEGER NOT NULL,
+    uname TEXT NOT NULL DEFAULT '',
+    sign TEXT NOT NULL DEFAULT '',
+    mtime INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL DEFAULT 0,
+    generation INTEGER NOT NULL DEFAULT 0,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (owner, mid)
+);
+CREATE INDEX IF NOT EXISTS idx_following_mid ON following (mid);
+CREATE INDEX IF NOT EXISTS idx_following_mtime ON following (owner, mtime);
+CREATE INDEX IF NOT EXISTS idx_following_uname ON following (owner, uname);
+CREATE INDEX IF NOT EXISTS idx_following_position ON following (owner, position);
+CREATE TABLE IF NOT EXISTS meta (
+    owner TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (owner, key)
+);
+"""
+
+
+class FollowingStore:
+    """关注列表的本地 SQLite 存储
+
+    按账号（owner）保存关注用户，position 记录服务器返回的顺序，
+    在 mid、mtime、uname 上建立索引，无需联网即可加载、排序、筛选和导出。
+    """
+
+    def __init__(self, db_path: str, keep_raw: bool = False):
+        """初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+            keep_raw: 读取时是否保留完整的原始数据
+        """
+        self.db_path = db_path
+        self.keep_raw = keep_raw
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row(owner: str, user: FollowingUser, position: int, generation: int) -> tuple:
+        return (
+            owner,
+            user.mid,
+            user.uname,
+            user.sign,
+            user.mtime,
+            position,
+            generation,
+            json.dumps(user.to_dict(), ensure_ascii=False),
+        )
+
+    def start_generation(self, owner: str) -> int:
+        """开始一次完整写入，返回本次写入的代号"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(generation) FROM following WHERE owner = ?', (owner,)).fetchone()
+        return (row[0] or 0) + 1
+
+    def write_page(self, owner: str, users: List[FollowingUser], position: int, generation: int):
+        """写入一页关注用户
+
+        Args:
+            owner: 账号ID
+            users: 一页关注用户
+            position: 该页第一个用户在列表中的位置
+            generation: start_generation 返回的代号
+        """
+        rows = [self._row(owner, user, position + i, generation) for i, user in enumerate(users)]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO following (owner, mid, uname, sign, mtime, position, generation, raw) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def finish_generation(self, owner: str, generation: int):
+        """完整写入结束，删除本次未出现的用户并更新水位线"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM following WHERE owner = ? AND generation != ?', (owner, generation))
+            total, watermark = self._conn.execute(
+                'SELECT COUNT(*), MAX(mtime) FROM following WHERE owner = ?', (owner,)).fetchone()
+            self._set_meta(owner, total=total, watermark=watermark or 0, updated_at=int(time.time()))
+
+    def add_users(self, owner: str, users: List[FollowingUser]):
+        """插入新关注的用户，排在列表最前，已存在的用户保持不变
+
+        水位线不变，下次增量同步时仍会从服务器读取这些用户的完整数据。
+        """
+        with self._lock, self._conn:
+            first, generation = self._conn.execute(
+                'SELECT MIN(position), MAX(generation) FROM following WHERE owner = ?', (owner,)).fetchone()
+            position = (first or 0) - len(users)
+            rows = [self._row(owner, user, position + i, generation or 0) for i, user in enumerate(users)]
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO following (owner, mid, uname, sign, mtime, position, generation, raw) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._update_total(owner)
+
+    def remove_users(self, owner: str, mids: Iterable[int]):
+        """删除已取消关注的用户"""
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM following WHERE owner = ? AND mid = ?',
+                                   [(owner, mid) for mid in mids])
+            self._update_total(owner)
+
+    def _update_total(self, owner: str):
+        # 只更新完整同步过的账号，total 与表中行数保持一致
+        if self._conn.execute("SELECT 1 FROM meta WHERE owner = ? AND key = 'total'", (owner,)).fetchone():
+            total = self._conn.execute('SELECT COUNT(*) FROM following WHERE owner = ?', (owner,)).fetchone()[0]
+            self._set_meta(owner, total=total)
+
+    def update_order(self, owner: str, users: List[FollowingUser]):
+        """按 users 的顺序更新完整列表，删除不在其中的用户
+
+        带有原始数据的用户（刚从服务器读取的）整行写入；其余用户只更新位置，
+        保留数据库中已保存的完整原始数据，增量同步时无需把整个列表的原始数据读入内存。
+        """
+        generation = self.start_generation(owner)
+        fetched = [self._row(owner, user, i, generation) for i, user in enumerate(users) if user.raw is not None]
+        known = [self._row(owner, user, i, generation) for i, user in enumerate(users) if user.raw is None]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO following (owner, mid, uname, sign, mtime, position, generation, raw) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', fetched)
+            self._conn.executemany(
+                'INSERT INTO following (owner, mid, uname, sign, mtime, position, generation, raw) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (owner, mid) DO UPDATE SET position = excluded.position, generation = excluded.generation',
+                known)
+        self.finish_generation(owner, generation)
+
+    def replace_all(self, owner: str, users: List[FollowingUser]):
+        """用完整列表替换该账号的全部数据"""
+        generation = self.start_generation(owner)
+        self.write_page(owner, users, 0, generation)
+        self.finish_generation(owner, generation)
+
+    def _set_meta(self, owner: str, **values):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO meta (owner, key, value) VALUES (?, ?, ?)',
+            [(owner, key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()])
+
+    def set_meta(self, owner: str, **values):
+        """保存账号相关的附加信息"""
+        with self._lock, self._conn:
+            self._set_meta(owner, **values)
+
+    def get_meta(self, owner: str) -> Dict:
+        """读取账号相关的附加信息（total、watermark、updated_at 等）"""
+        with self._lock:
+            rows = self._conn.execute('SELECT key, value FROM meta WHERE owner = ?', (owner,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def count(self, owner: str) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM following WHERE owner = ?', (owner,)).fetchone()[0]
+
+    def _query(self, owner: str, order_by: Iterable[str], keyword: Optional[str], limit: Optional[int]):
+        sql = 'SELECT raw FROM following WHERE owner = ?'
+        params = [owner]
+        if keyword:
+            sql += " AND (uname LIKE ? ESCAPE '\\' OR sign LIKE ? ESCAPE '\\' OR CAST(mid AS TEXT) = ?)"
+            pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params += [pattern, pattern, keyword]
+        sql += ' ORDER BY ' + ', '.join(SORT_COLUMNS[column] for column in order_by)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def iter_users(self, owner: str, order_by: Iterable[str] = ('position',), keyword: Optional[str] = None,
+                   limit: Optional[int] = None, batch_size: int = 500,
+                   keep_raw: Optional[bool] = None) -> Iterator[FollowingUser]:
+        """按指定顺序逐个读取关注用户
+
+        Args:
+            owner: 账号ID
+            order_by: 排序列，可选 position、mtime、uname、mid
+            keyword: 按用户名、签名或 UID 筛选
+            limit: 最多返回的数量
+            batch_size: 每次从数据库读取的行数
+            keep_raw: 是否保留完整的原始数据，为 None 时使用初始化时的设置
+        """
+        keep_raw = self.keep_raw if keep_raw is None else keep_raw
+        sql, params = self._query(owner, order_by, keyword, limit)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchmany(batch_size)
+        while rows:
+            for (raw,) in rows:
+                yield FollowingUser.from_dict(json.loads(raw), keep_raw)
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+
+    def load(self, owner: str, order_by: Iterable[str] = ('position',), keyword: Optional[str] = None,
+             limit: Optional[int] = None, keep_raw: Optional[bool] = None) -> List[FollowingUser]:
+        """读取关注用户列表，参数同 iter_users"""
+        keep_raw = self.keep_raw if keep_raw is None else keep_raw
+        sql, params = self._query(owner, order_by, keyword, limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [FollowingUser.from_dict(json.loads(raw), keep_raw) for (raw,) in rows]
@@ -0,0 +1,76 @@
+import time
+from typing import Dict, Optional
+
+
+def format_mtime(mtime: int) -> str:
+    """把关注时间戳格式化为可读时间"""
+    if not mtime:
+        return '未知'
+    try:
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))
+    except (OverflowError, OSError, ValueError):
+        return '未知'
+
+
+class FollowingUser:
+    """关注列表中的一个用户，只保存程序用到的字段
+
+    接口返回的每个用户都带有头像挂件、会员、认证等大量嵌套字段，
+    这里只保留 UID、用户名、签名、关注时间、头像和认证说明；
+    关注时间在第一次显示时才格式化。完整的原始数据只在开启 keep_raw_user_data 时保留。
+    """
+
+    __slots__ = ('mid', 'uname', 'sign', 'mtime', 'face', 'official_desc', 'raw', '_mtime_str')
+
+    def __init__(self, mid: int, uname: str = '', sign: str = '', mtime: int = 0, face: str = '',
+                 official_desc: str = '', raw: Optional[Dict] = None):
+        self.mid = mid
+        self.uname = uname
+        self.sign = sign
+        self.mtime = mtime
+        self.face = face
+        self.official_desc = official_desc
+        self.raw = raw
+        self._mtime_str = None
+
+    @classmethod
+    def from_dict(cls, data: Dict, keep_raw: bool = False) -> 'FollowingUser':
+        """从接口返回的用户数据（或 to_dict 的结果）创建
+
+        Args:
+            data: 用户数据
+            keep_raw: 是否保留完整的原始数据
+        """
+        official = data.get('official_verify') or {}
+        return cls(
+            int(data['mid']),
+            data.get('uname') or '',
+            data.get('sign') or '',
+            data.get('mtime') or 0,
+            data.get('face') or '',
+            official.get('desc') or '',
+            data if keep_raw else None,
+        )
+
+    @property
+    def mtime_str(self) -> str:
+        """可读的关注时间"""
+        if self._mtime_str is None:
+            self._mtime_str = format_mtime(self.mtime)
+        return self._mtime_str
+
+    def to_dict(self) -> Dict:
+        """转换为接口格式的用户数据，保留了原始数据时直接返回原始数据"""
+        if self.raw is not None:
+            return self.raw
+        return {
+            'mid': self.mid,
+            'uname': self.uname,
+            'sign': self.sign,
+            'mtime': self.mtime,
+            'face': self.face,
+            'official_verify': {'desc': self.official_desc},
+        }
+
+    def __repr__(self) -> str:
+        return f"FollowingUser(mid={self.mid!r}, uname={self.uname!r})"
@@ -1,12 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
-import json
+import queue
+from collections import deque
 import os
 import sys
 import time
-from bilibili_api import BilibiliAPI
-from auto_login import auto_login_setup
+from bilibili_api import BilibiliAPI, RELATION_FOLLOW, RELATION_UNFOLLOW
+from export_pipeline import export_users
+from following_user import FollowingUser
+from import_parser import iter_import_users
+from search_index import SearchIndex
+from selection_model import SelectionModel
 
 def get_app_dir():
     """获取应用程序目录"""
@@ -17,8 +22,198 @@ def get_app_dir():
         # 开发环境
         return os.path.dirname(os.path.abspath(__file__))
 
+# 启动到首次绘制窗口的目标耗时（毫秒）
+FIRST_PAINT_TARGET_MS = 500
+
+# 每次插入表格的行数，插入之间让出事件循环，保证大列表加载时界面可响应
+ROW_CHUNK_SIZE = 200
+
+# 界面更新队列的刷新间隔（毫秒），约 20 帧每秒
+UI_FRAME_MS = 50
+
+# 各列的排序键，插入表格时计算一次，之后排序只比较这些值
+SORT_KEY_FUNCS = {
+    "用户名": lambda user: user.uname.casefold(),
+    "UID": lambda user: user.mid,
+    "关注时间": lambda user: user.mtime,
+    "签名": lambda user: user.sign.strip().casefold(),
+}
+
+
+class UIDispatcher:
+    """工作线程与 Tk 主线程之间的界面更新队列
+
+    工作线程只向队列写入事件，不直接调用 Tk；主线程按固定帧率取出并执行。
+    同一帧内的状态栏更新只保留最后一条，删除表格行合并为一次调用，
+    上千个条目的批量任务只需几十次界面刷新。
+
+    每帧开始时先安排下一帧，待执行的调用逐个取出：某个调用弹出提示框时，
+    提示框自己的事件循环会继续执行之后的帧，界面更新不会停在提示框上，顺序也保持不变。
+    """
+
+    def __init__(self, root, status_setter, frame_ms=UI_FRAME_MS, on_rows_deleted=None):
+        """初始化界面更新队列
+
+        Args:
+            root: Tk 根窗口
+            status_setter: 在主线程中更新状态栏的函数
+            frame_ms: 刷新间隔（毫秒）
+            on_rows_deleted: 删除表格行后调用 on_rows_deleted(tree, items)
+        """
+        self.root = root
+        self.status_setter = status_setter
+        self.on_rows_deleted = on_rows_deleted
+        self.frame_ms = frame_ms
+        self._calls = queue.SimpleQueue()
+        self._pending = deque()  # 已从队列取出、尚未执行的调用
+        self._lock = threading.Lock()
+        self._status = None
+        self._deleted_rows = {}
+        self.frame_count = 0  # 实际执行过界面更新的帧数
+
+    def start(self):
+        self.root.after(self.frame_ms, self._drain)
+
+    def post(self, func, *args):
+        """在主线程中调用 func(*args)，按提交顺序执行"""
+        self._calls.put((func, args))
+
+    def set_status(self, message):
+        """更新状态栏，同一帧内只显示最后一条"""
+        with self._lock:
+            self._status = message
+
+    def delete_row(self, tree, item):
+        """删除表格行，同一帧内的删除合并为一次调用"""
+        with self._lock:
+            self._deleted_rows.setdefault(tree, []).append(item)
+
+    @staticmethod
+    def _run(func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"界面更新失败: {e}")
+
+    def _delete_rows(self, tree, items):
+        if not tree.winfo_exists():
+            return
+        items = [item for item in items if tree.exists(item)]
+        tree.delete(*items)
+        if self.on_rows_deleted:
+            self.on_rows_deleted(tree, items)
+
+    def _drain(self):
+        # 先安排下一帧，本帧中的任何一步出错或阻塞都不会让队列停止刷新
+        self.root.after(self.frame_ms, self._drain)
+        
+        with self._lock:
+            status, self._status = self._status, None
+            deleted_rows, self._deleted_rows = self._deleted_rows, {}
+        
+        while True:
+            try:
+                self._pending.append(self._calls.get_nowait())
+            except queue.Empty:
+                break
+        
+        if status is not None or deleted_rows or self._pending:
+            self.frame_count += 1
+        
+        # 先删除行、更新状态，再按顺序执行其他调用，保证收尾的统计和提示看到最新的表格
+        for tree, items in deleted_rows.items():
+            self._run(self._delete_rows, tree, items)
+        if status is not None:
+            self._run(self.status_setter, status)
+        while self._pending:
+            func, args = self._pending.popleft()
+            self._run(func, *args)
+
+class CheckboxPainter:
+    """只重绘表格中可见行的勾选框
+
+    勾选状态保存在 SelectionModel 中，批量勾选只修改位图，
+    表格只重绘当前可见的几十行；滚动、过滤或窗口大小变化后再重绘新露出的行。
+    """
+
+    def __init__(self, root, tree, selection, item_keys):
+        """初始化勾选框绘制
+
+        Args:
+            root: Tk 根窗口
+            tree: 表格
+            selection: 勾选状态
+            item_keys: tree item ID 到 mid 的映射
+        """
+        self.root = root
+        self.tree = tree
+        self.selection = selection
+        self.item_keys = item_keys
+        self._painted = {}      # 每行当前显示的勾选状态
+        self._children = None  # 表格当前显示的行，结构变化后重新读取
+        self._scheduled = False
+        tree.bind("<Configure>", lambda event: self.schedule(), add="+")
+
+    def yscrollcommand(self, scrollbar):
+        """包装滚动条的 set，滚动后重绘新露出的行"""
+        def command(first, last):
+            scrollbar.set(first, last)
+            self.schedule()
+        return command
+
+    def text(self, key):
+        return "☑" if self.selection.is_selected(key) else "☐"
+
+    def mark(self, item, key):
+        """记录某一行已按当前勾选状态显示"""
+        self._painted[item] = self.selection.is_selected(key)
+
+    def schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            self.root.after_idle(self.repaint)
+
+    def invalidate(self):
+        """表格的行被插入、过滤或重新排序后调用"""
+        self._children = None
+        self.schedule()
+
+    def forget(self, items):
+        for item in items:
+            self._painted.pop(item, None)
+        self.invalidate()
+
+    def reset(self):
+        self._painted.clear()
+        self.invalidate()
+
+    def visible_items(self):
+        if self._children is None:
+            self._children = self.tree.get_children()
+        total = len(self._children)
+        if not total:
+            return ()
+        first, last = self.tree.yview()
+        return self._children[int(first * total):min(total, int(last * total) + 2)]
+
+    def repaint(self):
+        self._scheduled = False
+        if not self.tree.winfo_exists():
+            return
+        for item in self.visible_items():
+            key = self.item_keys.get(item)
+            if key is None:
+                continue
+            checked = self.selection.is_selected(key)
+            if self._painted.get(item) != checked:
+                self.tree.item(item, text="☑" if checked else "☐")
+                self._painted[item] = checked
+
+
 class BilibiliManagerGUI:
     def __init__(self, root):
+        self.start_time = time.perf_counter()
+        self.first_paint_ms = None
         self.root = root
         self.root.title("B站关注管理器")
         self.root.geometry("968x732")
@@ -28,12 +223,38 @@ class BilibiliManagerGUI:
         
         self.api = None
         self.following_list = []
-        self.checked_items = {}  # 存储选中状态
-        self.item_data = {}      # 存储 tree item ID 到完整用户数据的映射
+        self.following_is_live = False  # 关注列表是否为本次运行中从服务器获取或同步的
+        self.following_fetches = 0  # 从服务器获取关注列表的次数，用于丢弃过时的缓存读取结果
+        self.selection = SelectionModel()  # 按 mid 保存勾选状态，刷新列表后仍然保留
+        self.item_data = {}      # tree item ID 到用户数据（FollowingUser）的映射
+        self.item_mids = {}      # tree item ID 到 mid 的映射
+        self.mid_items = {}      # mid 到 tree item ID 的映射
+        self._pending_rows = {}  # 每个表格待插入的行
+        self._row_jobs = {}      # 每个表格已安排的插入任务
+        self.search_index = SearchIndex()  # 按插入顺序索引表格中的用户
+        self.row_items = []      # 搜索索引下标到 tree item ID 的映射，已删除的为 None
+        self.item_positions = {} # tree item ID 到搜索索引下标的映射
+        self.matching_items = None  # 当前搜索匹配的行，未搜索时为 None
+        self.sort_columns = []   # 排序列及是否降序，靠前的优先
+        self.sort_keys = {column: [] for column in SORT_KEY_FUNCS}  # 每列按搜索索引下标保存的排序键
+        self.sort_rank = None    # 搜索索引下标到排序名次的映射，未排序时为 None
+        self._shift_click = False
+        self.check_anchor = None # 上次单击勾选框的行，Shift+点击时从这里勾选到点击的行
         
         self.create_widgets()
+        self.ui = UIDispatcher(self.root, self.update_status, on_rows_deleted=self.on_rows_deleted)
+        self.ui.start()
+        self.root.bind("<Map>", self.on_first_paint, add="+")
         self.check_config()
     
+    def on_first_paint(self, event):
+        """记录从启动到窗口首次绘制的耗时"""
+        if event.widget is not self.root or self.first_paint_ms is not None:
+            return
+        self.first_paint_ms = (time.perf_counter() - self.start_time) * 1000
+        if self.first_paint_ms > FIRST_PAINT_TARGET_MS:
+            print(f"启动耗时 {self.first_paint_ms:.0f} ms，超过目标 {FIRST_PAINT_TARGET_MS} ms")
+    
     def setup_theme(self):
         style = ttk.Style()
         
@@ -198,6 +419,20 @@ class BilibiliManagerGUI:
                                              disabledforeground='lightgray')
         self.import_follow_button.pack(side=tk.LEFT, padx=(0, 15))
         
+        self.resume_job_button = tk.Button(button_frame, text="▶️ 恢复任务", 
+                                           command=self.resume_job, 
+                                           state="disabled",
+                                           bg='#FA8C16',
+                                           fg='white',
+                                           font=('Microsoft YaHei UI', 9),
+                                           relief='flat',
+                                           padx=15, pady=8,
+                                           cursor='hand2',
+                                           activebackground='#D46B08',
+                                           activeforeground='white',
+                                           disabledforeground='lightgray')
+        self.resume_job_button.pack(side=tk.LEFT, padx=(0, 15))
+        
         # 关于按钮
         self.about_button = tk.Button(button_frame, text="ℹ️ 关于", 
                                      command=self.show_about, 
@@ -264,7 +499,18 @@ class BilibiliManagerGUI:
                                             padx=12, pady=5,
                                             cursor='hand2',
                                             activebackground='#E0E0E0')
-        self.select_none_button.pack(side=tk.LEFT)
+        self.select_none_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.invert_selection_button = tk.Button(list_toolbar, text="反选", 
+                                                 command=self.invert_selection, state="disabled",
+                                                 bg='#F0F0F0',
+                                                 fg=self.colors['text_primary'],
+                                                 font=('Microsoft YaHei UI', 8),
+                                                 relief='flat',
+                                                 padx=12, pady=5,
+                                                 cursor='hand2',
+                                                 activebackground='#E0E0E0')
+        self.invert_selection_button.pack(side=tk.LEFT)
         
         self.count_label = tk.Label(list_toolbar, text="共 0 个关注", 
                                    font=("Microsoft YaHei UI", 10),
@@ -272,6 +518,29 @@ class BilibiliManagerGUI:
                                    bg=self.colors['bg_dark'])
         self.count_label.pack(side=tk.RIGHT)
         
+        # 搜索框：按用户名、UID、签名或认证信息过滤，输入即过滤
+        self.select_matching_button = tk.Button(list_toolbar, text="勾选匹配项", 
+                                                command=self.select_matching,
+                                                bg='#F0F0F0',
+                                                fg=self.colors['text_primary'],
+                                                font=('Microsoft YaHei UI', 8),
+                                                relief='flat',
+                                                padx=12, pady=5,
+                                                cursor='hand2',
+                                                activebackground='#E0E0E0')
+        self.select_matching_button.pack(side=tk.RIGHT, padx=(10, 15))
+        
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.apply_search_filter)
+        search_entry = tk.Entry(list_toolbar, textvariable=self.search_var, width=20,
+                                font=("Microsoft YaHei UI", 9), relief='flat')
+        search_entry.pack(side=tk.RIGHT, ipady=4)
+        
+        search_label = tk.Label(list_toolbar, text="🔍",
+                                font=("Microsoft YaHei UI", 10),
+                                bg=self.colors['bg_dark'])
+        search_label.pack(side=tk.RIGHT, padx=(10, 2))
+        
         # 创建表格容器
         table_frame = tk.Frame(list_card, bg=self.colors['bg_dark'])
         table_frame.pack(fill=tk.BOTH, expand=True)
@@ -280,12 +549,16 @@ class BilibiliManagerGUI:
         columns = ("用户名", "UID", "关注时间", "签名")
         self.tree = ttk.Treeview(table_frame, columns=columns, show="tree headings", height=15, selectmode="extended")
         
-        # 设置列标题
+        # 设置列标题，点击按该列排序，按住 Shift 点击追加为次要排序列
         self.tree.heading("#0", text="✓")
-        self.tree.heading("用户名", text="👤 用户名")
-        self.tree.heading("UID", text="🆔 UID")
-        self.tree.heading("关注时间", text="⏰ 关注时间")
-        self.tree.heading("签名", text="📝 签名")
+        self.heading_texts = {
+            "用户名": "👤 用户名",
+            "UID": "🆔 UID",
+            "关注时间": "⏰ 关注时间",
+            "签名": "📝 签名",
+        }
+        for column, text in self.heading_texts.items():
+            self.tree.heading(column, text=text, command=lambda c=column: self.sort_by_column(c))
         
         # 设置列宽
         self.tree.column("#0", width=60, minwidth=60)
@@ -296,10 +569,12 @@ class BilibiliManagerGUI:
         
         # 绑定点击事件
         self.tree.bind("<ButtonRelease-1>", self.on_tree_click)
+        self.tree.bind("<Button-1>", self.on_tree_press, add="+")
         
-        # 滚动条
+        # 滚动条，滚动时只重绘新露出行的勾选框
         scrollbar_y = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar_y.set)
+        self.checkbox_painter = CheckboxPainter(self.root, self.tree, self.selection, self.item_mids)
+        self.tree.configure(yscrollcommand=self.checkbox_painter.yscrollcommand(scrollbar_y))
         
         # 布局
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -317,59 +592,255 @@ class BilibiliManagerGUI:
         self.status_bar.pack(fill=tk.BOTH, padx=10, pady=5)
     
     def check_config(self):
+        """读取配置并立即显示缓存的用户信息和关注列表，登录状态在后台验证"""
         config_path = os.path.join(get_app_dir(), 'config.json')
         if os.path.exists(config_path):
             try:
                 self.api = BilibiliAPI()
-                user_info = self.api.get_user_info()
-                if user_info:
-                    self.status_indicator.config(fg=self.colors['success'])
-                    self.status_label.config(text="已登录", fg=self.colors['success'])
-                    self.user_info_label.config(text=f"👋 欢迎回来，{user_info.get('uname', '未知')} (ID: {user_info.get('mid', '未知')})")
-                    self.login_button.config(text="🚪 退出登录", command=self.logout, bg=self.colors['danger'])
-                    self.enable_buttons()
-                    self.update_status("✅ 登录成功，可以开始使用了")
-                else:
-                    self.status_indicator.config(fg=self.colors['warning'])
-                    self.status_label.config(text="登录已过期", fg=self.colors['warning'])
-                    self.login_button.config(text="🔐 设置登录", command=self.setup_login, bg=self.colors['primary'])
-                    self.update_status("⚠️ 登录信息已过期，请重新设置")
+                cached_info = self.api.store.get_meta(self.api.owner)
             except Exception:
-                self.status_indicator.config(fg=self.colors['danger'])
-                self.status_label.config(text="配置错误", fg=self.colors['danger'])
-                self.login_button.config(text="🔐 设置登录", command=self.setup_login, bg=self.colors['primary'])
-                self.update_status("❌ 配置文件错误")
+                self.show_config_error()
+                return
+            
+            self.status_indicator.config(fg=self.colors['warning'])
+            self.status_label.config(text="正在验证登录...", fg=self.colors['text_secondary'])
+            if cached_info.get('uname'):
+                self.user_info_label.config(text=f"👋 欢迎回来，{cached_info['uname']} (ID: {self.api.owner})")
+            self.update_status("🔄 正在验证登录状态...")
+            
+            api = self.api
+            fetches = self.following_fetches
+            
+            def session_thread():
+                # 在工作线程中读取并解码本地保存的关注列表，无需联网，也不阻塞窗口首次绘制
+                try:
+                    cached_following = api.load_cached_following()
+                except Exception:
+                    cached_following = []
+                if cached_following:
+                    self.ui.post(self.show_cached_following, api, fetches, cached_following)
+                
+                try:
+                    user_info = api.get_user_info()
+                except Exception:
+                    self.ui.post(self.show_config_error)
+                    return
+                self.ui.post(self.on_session_checked, api, user_info)
+            
+            thread = threading.Thread(target=session_thread)
+            thread.daemon = True
+            thread.start()
         else:
             self.login_button.config(text="🔐 设置登录", command=self.setup_login, bg=self.colors['primary'])
             self.update_status("💡 首次使用？点击\"设置登录\"开始吧")
     
+    def show_cached_following(self, api, fetches, cached_following):
+        """显示本地保存的关注列表，读取期间已退出登录或开始从服务器获取时丢弃"""
+        if api is not self.api or fetches != self.following_fetches:
+            return
+        self.update_following_list(cached_following, live=False)
+    
+    def on_session_checked(self, api, user_info):
+        """后台登录验证完成后更新界面"""
+        if api is not self.api:
+            return  # 验证期间已退出或重新登录
+        
+        if user_info:
+            self.status_indicator.config(fg=self.colors['success'])
+            self.status_label.config(text="已登录", fg=self.colors['success'])
+            self.user_info_label.config(text=f"👋 欢迎回来，{user_info.get('uname', '未知')} (ID: {user_info.get('mid', '未知')})")
+            self.login_button.config(text="🚪 退出登录", command=self.logout, bg=self.colors['danger'])
+            self.enable_buttons()
+            self.api.store.set_meta(self.api.owner, uname=user_info.get('uname', ''))
+            if self.api.pending_jobs():
+                self.update_status("⏸️ 发现未完成的批量任务，点击\"恢复任务\"继续执行")
+            else:
+                self.update_status("✅ 登录成功，可以开始使用了")
+        else:
+            self.status_indicator.config(fg=self.colors['warning'])
+            self.status_label.config(text="登录已过期", fg=self.colors['warning'])
+            self.login_button.config(text="🔐 设置登录", command=self.setup_login, bg=self.colors['primary'])
+            self.update_status("⚠️ 登录信息已过期，请重新设置")
+    
+    def show_config_error(self):
+        self.status_indicator.config(fg=self.colors['danger'])
+        self.status_label.config(text="配置错误", fg=self.colors['danger'])
+        self.login_button.config(text="🔐 设置登录", command=self.setup_login, bg=self.colors['primary'])
+        self.update_status("❌ 配置文件错误")
+    
     def setup_login(self):
-        def login_thread():
-            self.update_status("🔄 正在设置登录...")
-            self.login_button.config(state="disabled")
+        """扫码登录，无需浏览器"""
+        self.update_status("🔄 正在获取登录二维码...")
+        self.login_button.config(state="disabled")
+        
+        def generate_thread():
+            from qr_login import BilibiliQRLogin, qr_matrix
+            login_tool = BilibiliQRLogin()
+            try:
+                url, qrcode_key = login_tool.generate()
+                matrix = qr_matrix(url)
+            except Exception:
+                self.ui.post(self.login_failed)
+                return
+            self.ui.post(self.show_qr_login_window, login_tool, qrcode_key, matrix)
+        
+        thread = threading.Thread(target=generate_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def show_qr_login_window(self, login_tool, qrcode_key, matrix):
+        """在画布上显示登录二维码，后台轮询扫码状态"""
+        module_size = 6
+        canvas_size = len(matrix) * module_size
+        
+        qr_window = tk.Toplevel(self.root)
+        qr_window.title("🔐 扫码登录")
+        qr_window.configure(bg=self.colors['bg_light'])
+        qr_window.resizable(False, False)
+        qr_window.transient(self.root)
+        qr_window.grab_set()
+        
+        main_frame = tk.Frame(qr_window, bg=self.colors['bg_light'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=20)
+        
+        canvas = tk.Canvas(main_frame, width=canvas_size, height=canvas_size,
+                           bg='white', highlightthickness=0)
+        canvas.pack()
+        for y, row in enumerate(matrix):
+            for x, dark in enumerate(row):
+                if dark:
+                    canvas.create_rectangle(x * module_size, y * module_size,
+                                            (x + 1) * module_size, (y + 1) * module_size,
+                                            fill='black', outline='')
+        
+        qr_status_label = tk.Label(main_frame, text="请使用B站手机客户端扫描二维码",
+                                   font=("Microsoft YaHei UI", 10),
+                                   fg=self.colors['text_primary'],
+                                   bg=self.colors['bg_light'])
+        qr_status_label.pack(pady=(15, 10))
+        
+        closed = threading.Event()
+        
+        def close_window():
+            closed.set()
+            qr_window.destroy()
+        
+        def use_browser():
+            close_window()
+            self.setup_browser_login()
+        
+        browser_btn = tk.Button(main_frame, text="🌐 改用浏览器登录",
+                                command=use_browser,
+                                bg='#F0F0F0',
+                                fg=self.colors['text_primary'],
+                                font=('Microsoft YaHei UI', 9),
+                                relief='flat',
+                                padx=15, pady=6,
+                                cursor='hand2',
+                                activebackground='#E0E0E0')
+        browser_btn.pack()
+        
+        def use_browser_cookies():
+            cookies_btn.config(state="disabled")
+            qr_status_label.config(text="正在读取本机浏览器的登录信息...")
             
+            # 读取数据库和解密（可能弹出系统密钥环授权）都在工作线程中进行
+            def import_thread():
+                from browser_cookies import browser_cookie_login_setup
+                try:
+                    success = browser_cookie_login_setup()
+                except Exception:
+                    success = False
+                
+                def finish():
+                    if closed.is_set():
+                        return
+                    if success:
+                        close_window()
+                        self.login_success()
+                    else:
+                        cookies_btn.config(state="normal")
+                        qr_status_label.config(text="没有在本机浏览器中找到B站登录信息")
+                self.ui.post(finish)
+            
+            thread = threading.Thread(target=import_thread)
+            thread.daemon = True
+            thread.start()
+        
+        cookies_btn = tk.Button(main_frame, text="🍪 从本机浏览器导入登录",
+                                command=use_browser_cookies,
+                                bg='#F0F0F0',
+                                fg=self.colors['text_primary'],
+                                font=('Microsoft YaHei UI', 9),
+                                relief='flat',
+                                padx=15, pady=6,
+                                cursor='hand2',
+                                activebackground='#E0E0E0')
+        cookies_btn.pack(pady=(8, 0))
+        
+        qr_window.protocol("WM_DELETE_WINDOW", lambda: (close_window(), self.login_failed()))
+        
+        def set_qr_status(code, text):
+            if not closed.is_set():
+                qr_status_label.config(text=text)
+        
+        def poll_thread():
+            from auto_login import BilibiliAutoLogin
+            cookies = login_tool.wait_for_login(
+                qrcode_key,
+                status_callback=lambda code, text: self.ui.post(set_qr_status, code, text),
+                cancelled=closed.is_set)
+            if closed.is_set():
+                return
+            success = bool(cookies) and BilibiliAutoLogin().create_config_file(cookies)
+            
+            def finish():
+                if closed.is_set():
+                    return
+                close_window()
+                if success:
+                    self.login_success()
+                else:
+                    self.login_failed()
+            self.ui.post(finish)
+        
+        thread = threading.Thread(target=poll_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def setup_browser_login(self):
+        self.update_status("🔄 正在设置登录...")
+        self.login_button.config(state="disabled")
+        
+        def login_thread():
             try:
-                success = auto_login_setup()
+                from auto_login import auto_login_setup
+                success = auto_login_setup('browser')
                 if success:
-                    self.root.after(0, self.login_success)
+                    self.ui.post(self.login_success)
                 else:
-                    self.root.after(0, self.login_failed)
+                    self.ui.post(self.login_failed)
             except Exception:
-                self.root.after(0, self.login_failed)
+                self.ui.post(self.login_failed)
         
         thread = threading.Thread(target=login_thread)
         thread.daemon = True
         thread.start()
     
     def logout(self):
-        """退出登录，删除配置文件"""
+        """退出登录，删除配置文件和浏览器登录保存的会话"""
         # 确认退出
         if not messagebox.askyesno("🚪 确认退出", 
-                                  "确定要退出登录吗？\n\n这将删除本地保存的登录信息，\n下次需要重新登录。", 
+                                  "确定要退出登录吗？\n\n这将删除本地保存的登录信息（包括浏览器登录保存的会话），\n下次需要重新登录。", 
                                   icon="question"):
             return
         
         try:
+            # 浏览器登录的用户目录中仍保存着有效的会话，一并删除；
+            # 浏览器仍在运行而删除失败时保留配置文件，保持登录状态不变
+            from auto_login import BilibiliAutoLogin
+            BilibiliAutoLogin().clear_profile()
+            
             # 删除配置文件
             config_path = os.path.join(get_app_dir(), 'config.json')
             if os.path.exists(config_path):
@@ -389,16 +860,16 @@ class BilibiliManagerGUI:
             self.batch_unfollow_button.config(state="disabled")
             self.export_button.config(state="disabled")
             self.import_follow_button.config(state="disabled")
+            self.resume_job_button.config(state="disabled")
             self.select_all_button.config(state="disabled")
             self.select_none_button.config(state="disabled")
+            self.invert_selection_button.config(state="disabled")
             self.batch_check_button.config(state="disabled")
             self.batch_uncheck_button.config(state="disabled")
             
             # 清空关注列表
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            self.following_list = []
-            self.count_label.config(text="共 0 个关注")
+            self.search_var.set("")
+            self.clear_following_list()
             
             # 更新状态
             self.update_status("🚪 已退出登录，点击\"设置登录\"重新开始")
@@ -423,60 +894,322 @@ class BilibiliManagerGUI:
         self.batch_unfollow_button.config(state="normal")
         self.export_button.config(state="normal")
         self.import_follow_button.config(state="normal")
+        self.resume_job_button.config(state="normal")
         self.select_all_button.config(state="normal")
         self.select_none_button.config(state="normal")
+        self.invert_selection_button.config(state="normal")
         self.batch_check_button.config(state="normal")
         self.batch_uncheck_button.config(state="normal")
     
+    def enqueue_rows(self, tree, rows, on_chunk=None):
+        """把行加入表格的待插入队列并分批插入
+        
+        第一批立即插入，其余每批之间通过 root.after 让出事件循环。
+        
+        Args:
+            tree: 目标表格
+            rows: (text, values, payload) 的列表
+            on_chunk: 每插入一批调用 on_chunk([(item_id, payload), ...])
+        """
+        key = str(tree)
+        pending = self._pending_rows.setdefault(key, deque())
+        pending.extend((text, values, payload, on_chunk) for text, values, payload in rows)
+        if key not in self._row_jobs:
+            self._insert_pending_rows(tree)
+    
+    def _insert_pending_rows(self, tree):
+        key = str(tree)
+        self._row_jobs.pop(key, None)
+        pending = self._pending_rows.get(key)
+        if not pending:
+            return
+        if not tree.winfo_exists():
+            pending.clear()  # 窗口已关闭
+            return
+        
+        inserted = {}
+        for _ in range(min(ROW_CHUNK_SIZE, len(pending))):
+            text, values, payload, on_chunk = pending.popleft()
+            item_id = tree.insert("", tk.END, text=text, values=values)
+            inserted.setdefault(on_chunk, []).append((item_id, payload))
+        for on_chunk, items in inserted.items():
+            if on_chunk:
+                on_chunk(items)
+        
+        if pending:
+            self._row_jobs[key] = self.root.after(1, lambda: self._insert_pending_rows(tree))
+    
+    def clear_rows(self, tree, detached=()):
+        """清空表格，包括尚未插入的行
+
+        Args:
+            tree: 表格
+            detached: 可能已被 detach 的行（搜索过滤时隐藏的行不在 get_children 中），一并删除
+        """
+        key = str(tree)
+        job = self._row_jobs.pop(key, None)
+        if job:
+            self.root.after_cancel(job)
+        self._pending_rows.pop(key, None)
+        items = dict.fromkeys(tree.get_children())
+        items.update(dict.fromkeys(item for item in detached if item is not None and tree.exists(item)))
+        tree.delete(*items)
+    
     def refresh_following(self):
+        if self.api is None:
+            messagebox.showerror("❌ 错误", "请先登录以获取关注列表")
+            return
+        
+        self.refresh_button.config(state="disabled")
+        self.update_status("🔄 正在获取关注列表...")
+        self.following_fetches += 1
+        api = self.api
+        
         def refresh_thread():
-            self.root.after(0, lambda: self.refresh_button.config(state="disabled"))
-            self.root.after(0, lambda: self.update_status("🔄 正在获取关注列表..."))
-            
             try:
-                if self.api is None:
-                    self.root.after(0, lambda: messagebox.showerror("❌ 错误", "请先登录以获取关注列表"))
-                    self.root.after(0, self.refresh_failed)
+                if api.has_following_snapshot():
+                    # 已有快照时增量同步，通常只需一两次请求
+                    self.ui.post(self.update_following_list, api.sync_following())
                     return
-                following_list = self.api.get_all_following()
-                self.root.after(0, lambda: self.update_following_list(following_list))
+                
+                self.ui.post(self.clear_following_list)
+                # 每获取一页就插入表格，无需等待整个列表下载完成
+                for page in api.iter_following_pages():
+                    self.ui.post(self.append_following_page, page)
+                self.ui.post(self.finish_following_list)
             except Exception:
-                self.root.after(0, self.refresh_failed)
+                self.ui.post(self.refresh_failed)
         
         thread = threading.Thread(target=refresh_thread)
         thread.daemon = True
         thread.start()
     
-    def update_following_list(self, following_list):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def update_following_list(self, following_list, live=True):
+        self.clear_following_list()
+        self.append_following_page(following_list)
+        self.finish_following_list(live)
+    
+    def clear_following_list(self):
+        self.clear_rows(self.tree, self.row_items)
         
-        self.following_list = following_list
-        self.checked_items = {}  # 重置选中状态
-        self.item_data = {}      # 重置数据映射
+        self.following_list = []
+        self.following_is_live = False
+        self.check_anchor = None
+        self.selection.set_present(())  # 只重置列表中的用户，勾选状态保留到新列表中
+        self.checkbox_painter.reset()
+        self.item_data.clear()   # 重置数据映射
+        self.item_mids.clear()
+        self.mid_items.clear()
+        self.search_index = SearchIndex()
+        self.row_items = []
+        self.item_positions = {}
+        for keys in self.sort_keys.values():
+            keys.clear()
+        self.sort_rank = None
+        if self.matching_items is not None:
+            self.matching_items = []  # 保留搜索词，新列表插入时重新过滤
+    
+    def append_following_page(self, page):
+        """将一页关注用户追加到表格"""
+        self.following_list.extend(page)
         
-        for user in following_list:
-            # 格式化时间显示
-            mtime_str = user.get('mtime_str', '未知')
-            
+        rows = []
+        for user in page:
             # 获取签名，如果为空则显示默认值
-            sign = user.get('sign', '').strip()
+            sign = user.sign.strip()
             if not sign:
                 sign = '暂无签名'
             
-            # 插入时设置默认为未选中
-            item_id = self.tree.insert("", tk.END, text="☐", values=(
-                user.get('uname', '未知'),
-                user.get('mid', ''),
-                mtime_str,
+            # 按已保存的勾选状态显示
+            rows.append((self.checkbox_painter.text(user.mid), (
+                user.uname or '未知',
+                user.mid,
+                user.mtime_str,
                 sign
-            ))
-            self.checked_items[item_id] = False
-            self.item_data[item_id] = user  # 保存完整的用户数据
+            ), user))
+        self.enqueue_rows(self.tree, rows, self._on_following_rows_inserted)
         
-        self.refresh_button.config(state="normal")
-        self.count_label.config(text=f"共 {len(following_list)} 个关注")
-        self.update_status(f"✅ 已加载 {len(following_list)} 个关注用户")
+        self.update_count_label()
+        self.update_status(f"🔄 已加载 {len(self.following_list)} 个关注用户...")
+    
+    def _on_following_rows_inserted(self, items):
+        """一批行插入表格后，登记数据并加入搜索索引"""
+        for item_id, user in items:
+            mid = user.mid
+            self.item_data[item_id] = user  # 保存用户数据
+            self.item_mids[item_id] = mid
+            self.mid_items[mid] = item_id
+            self.item_positions[item_id] = len(self.row_items)
+            self.row_items.append(item_id)
+        for column, keys in self.sort_keys.items():
+            keys.extend(map(SORT_KEY_FUNCS[column], (user for _, user in items)))
+        self.selection.add_present(user.mid for _, user in items)
+        self.search_index.add(user for _, user in items)
+        self.checkbox_painter.invalidate()
+        
+        if self.sort_columns:
+            self.update_sort_rank()
+        if self.matching_items is not None:
+            self.apply_search_filter()  # 新插入的行也按当前搜索词过滤
+        elif self.sort_columns:
+            self.apply_row_order()  # 新插入的行也按当前排序方式排列
+    
+    def on_rows_deleted(self, tree, items):
+        """取消关注成功的行被删除后，同步更新列表数据和搜索索引"""
+        if tree is not self.tree:
+            return
+        removed_mids = set()
+        positions = []
+        for item in items:
+            self.item_data.pop(item, None)
+            mid = self.item_mids.pop(item, None)
+            position = self.item_positions.pop(item, None)
+            if mid is not None:
+                removed_mids.add(mid)
+                self.mid_items.pop(mid, None)
+            if position is not None:
+                self.row_items[position] = None
+                positions.append(position)
+        self.selection.remove(removed_mids)
+        self.checkbox_painter.forget(items)
+        self.search_index.remove(positions)
+        self.following_list = [user for user in self.following_list if user.mid not in removed_mids]
+        if self.matching_items is not None:
+            self.matching_items = [item for item in self.matching_items if item in self.item_data]
+        self.update_count_label()
+    
+    def apply_search_filter(self, *args):
+        """按搜索框内容过滤表格，只显示匹配的行"""
+        query = self.search_var.get().strip()
+        if not query:
+            if self.matching_items is not None:
+                self.matching_items = None
+                self.apply_row_order()
+            return
+        
+        self.matching_items = [self.row_items[index] for index in self.ordered(self.search_index.search(query))]
+        self.apply_row_order()
+    
+    def apply_row_order(self):
+        """按搜索结果和排序方式重新排列表格
+        
+        通过 set_children 一次性调整行的顺序，不删除、不重新插入行。
+        """
+        if self.matching_items is not None:
+            items = self.matching_items
+        else:
+            rows = self.row_items
+            items = [rows[index] for index in self.ordered(range(len(rows))) if rows[index] is not None]
+        self.tree.set_children("", *items)
+        self.checkbox_painter.invalidate()
+        self.update_count_label()
+    
+    def ordered(self, positions):
+        """把搜索索引下标按当前排序方式排列，未排序时保持服务器返回的顺序"""
+        if self.sort_rank is None:
+            return list(positions)
+        return sorted(positions, key=self.sort_rank.__getitem__)
+    
+    def update_sort_rank(self):
+        """按排序列计算每行的名次
+        
+        从最次要的列开始依次做稳定排序，排序键相同的行保持原来的相对顺序。
+        """
+        if not self.sort_columns:
+            self.sort_rank = None
+            return
+        order = list(range(len(self.row_items)))
+        for column, descending in reversed(self.sort_columns):
+            order.sort(key=self.sort_keys[column].__getitem__, reverse=descending)
+        rank = [0] * len(order)
+        for position, index in enumerate(order):
+            rank[index] = position
+        self.sort_rank = rank
+    
+    def on_tree_press(self, event):
+        """记录点击列标题时是否按住了 Shift，列标题的 command 不带事件参数"""
+        if self.tree.identify_region(event.x, event.y) == "heading":
+            self._shift_click = bool(event.state & 0x0001)
+    
+    def sort_by_column(self, column):
+        """点击列标题排序
+        
+        单击：升序、降序、恢复默认顺序之间切换；
+        按住 Shift 单击：把该列追加为次要排序列，已在排序列中时切换升降序。
+        """
+        shift, self._shift_click = self._shift_click, False
+        current = dict(self.sort_columns)
+        
+        if shift and self.sort_columns:
+            if column in current:
+                self.sort_columns = [(c, not d if c == column else d) for c, d in self.sort_columns]
+            else:
+                self.sort_columns.append((column, False))
+        elif self.sort_columns == [(column, False)]:
+            self.sort_columns = [(column, True)]
+        elif self.sort_columns == [(column, True)]:
+            self.sort_columns = []
+        else:
+            self.sort_columns = [(column, False)]
+        
+        self.update_sort_rank()
+        self.update_sort_headings()
+        if self.matching_items is not None:
+            positions = (self.item_positions[item] for item in self.matching_items)
+            self.matching_items = [self.row_items[index] for index in self.ordered(positions)]
+        self.apply_row_order()
+    
+    def update_sort_headings(self):
+        """在列标题上显示排序方向，多列排序时显示优先级"""
+        priorities = {column: (number, descending)
+                      for number, (column, descending) in enumerate(self.sort_columns, 1)}
+        for column, text in self.heading_texts.items():
+            if column in priorities:
+                number, descending = priorities[column]
+                arrow = "▼" if descending else "▲"
+                text = f"{text} {arrow}{number if len(priorities) > 1 else ''}"
+            self.tree.heading(column, text=text)
+    
+    def matching_mask(self):
+        """当前搜索匹配行的位图，未搜索时为 None"""
+        if self.matching_items is None:
+            return None
+        return self.selection.mask(self.item_mids[item] for item in self.matching_items)
+    
+    def item_mask(self, items):
+        return self.selection.mask(self.item_mids[item] for item in items if item in self.item_mids)
+    
+    def selection_changed(self, message=None):
+        """勾选状态变化后重绘可见行并更新状态栏"""
+        self.checkbox_painter.schedule()
+        self.update_status(message or f"✅ 已勾选 {self.selection.count()} 个用户")
+    
+    def select_matching(self):
+        """勾选所有匹配搜索词的行"""
+        if self.matching_items is None:
+            messagebox.showinfo("提示", "请先在搜索框中输入关键词")
+            return
+        self.selection.select_mask(self.matching_mask())
+        self.selection_changed(f"✅ 已勾选 {len(self.matching_items)} 个匹配的用户")
+    
+    def update_count_label(self):
+        if self.matching_items is None:
+            self.count_label.config(text=f"共 {len(self.following_list)} 个关注")
+        else:
+            self.count_label.config(text=f"匹配 {len(self.matching_items)} 个 / 共 {len(self.following_list)} 个关注")
+    
+    def finish_following_list(self, live=True):
+        """关注列表加载完成
+
+        Args:
+            live: 列表是否刚从服务器获取；本地缓存可能已过时，不能用来判断是否已关注
+        """
+        self.following_is_live = live
+        if live:
+            # 显示缓存时登录状态可能尚未验证，刷新按钮由 on_session_checked 启用
+            self.refresh_button.config(state="normal")
+        self.update_count_label()
+        self.update_status(f"✅ 已加载 {len(self.following_list)} 个关注用户")
     
     def refresh_failed(self):
         self.refresh_button.config(state="normal")
@@ -484,16 +1217,28 @@ class BilibiliManagerGUI:
         self.update_status("❌ 获取关注列表失败")
     
     def select_all(self):
-        for item in self.tree.get_children():
-            self.checked_items[item] = True
-            self.tree.item(item, text="☑")
-            self.tree.selection_add(item)
+        """全选当前显示的行，搜索时只勾选匹配的行"""
+        mask = self.matching_mask()
+        if mask is None:
+            self.selection.select_all()
+        else:
+            self.selection.select_mask(mask)
+        self.selection_changed()
     
     def select_none(self):
-        for item in self.tree.get_children():
-            self.checked_items[item] = False
-            self.tree.item(item, text="☐")
+        """取消勾选当前显示的行，搜索时只取消匹配的行"""
+        mask = self.matching_mask()
+        if mask is None:
+            self.selection.clear()
+        else:
+            self.selection.deselect_mask(mask)
         self.tree.selection_remove(self.tree.selection())
+        self.selection_changed()
+    
+    def invert_selection(self):
+        """反选当前显示的行"""
+        self.selection.invert(self.matching_mask())
+        self.selection_changed()
     
     def batch_check_selected(self):
         """批量勾选树视图中当前选中的项目"""
@@ -504,12 +1249,8 @@ class BilibiliManagerGUI:
             return
             
         # 勾选所有选中的项
-        for item in selected_items:
-            self.checked_items[item] = True
-            self.tree.item(item, text="☑")
-        
-        # 更新状态
-        self.update_status(f"✅ 已批量勾选 {len(selected_items)} 个项目")
+        self.selection.select_mask(self.item_mask(selected_items))
+        self.selection_changed(f"✅ 已批量勾选 {len(selected_items)} 个项目")
     
     def batch_uncheck_selected(self):
         """批量取消勾选树视图中当前选中的项目"""
@@ -520,90 +1261,66 @@ class BilibiliManagerGUI:
             return
             
         # 取消勾选所有选中的项
-        for item in selected_items:
-            self.checked_items[item] = False
-            self.tree.item(item, text="☐")
-            # 同时从树的选择中移除（可选，根据需求决定）
-            # self.tree.selection_remove(item)
-        
-        # 更新状态
-        self.update_status(f"✅ 已批量取消勾选 {len(selected_items)} 个项目")
+        self.selection.deselect_mask(self.item_mask(selected_items))
+        self.selection_changed(f"✅ 已批量取消勾选 {len(selected_items)} 个项目")
     
     def batch_unfollow(self):
-        selected_items = [item for item, checked in self.checked_items.items() if checked]
-        if not selected_items:
+        # 在主线程中确定要删除的行，工作线程只处理UID
+        targets = {mid: self.mid_items[mid] for mid in self.selection.selected_mids() if mid in self.mid_items}
+        if not targets:
             messagebox.showwarning("⚠️ 警告", "请先选择要取消关注的用户")
             return
         
-        count = len(selected_items)
+        count = len(targets)
         if not messagebox.askyesno("⚠️ 确认操作", 
                                   f"确定要取消关注 {count} 个用户吗？\n\n⚠️ 此操作不可撤销！", 
                                   icon="warning"):
             return
         
+        self.batch_unfollow_button.config(state="disabled")
+        
         def unfollow_thread():
-            self.root.after(0, lambda: self.batch_unfollow_button.config(state="disabled"))
+            done_count = 0
+            
+            def on_progress(uid, success):
+                nonlocal done_count
+                done_count += 1
+                self.ui.set_status(f"🔄 正在取消关注 ({done_count}/{len(targets)})...")
+                if success:
+                    self.ui.delete_row(self.tree, targets[uid])
             
             success_count = 0
-            for item in selected_items:
-                try:
-                    values = self.tree.item(item)['values']
-                    uid = int(values[1])
-                    username = values[0]
-                    
-                    self.root.after(0, lambda u=username: self.update_status(f"🔄 正在取消关注: {u}"))
-                    
-                    if self.api and hasattr(self.api, "unfollow_user") and callable(getattr(self.api, "unfollow_user")):
-                        if self.api.unfollow_user(uid):
-                            success_count += 1
-                            self.root.after(0, lambda i=item: self.tree.delete(i))
-                    else:
-                        raise AttributeError("API对象未实现unfollow_user方法")
-                
-                except Exception:
-                    continue
+            if self.api:
+                job_id = self.api.start_job(RELATION_UNFOLLOW, targets, f'取消关注 {len(targets)} 个用户')
+                outcome = self.api.run_job(job_id, on_progress)
+                success_count = outcome['stats']['success']
             
-            self.root.after(0, lambda: self.batch_unfollow_button.config(state="normal"))
-            self.root.after(0, lambda: self.count_label.config(text=f"共 {len(self.tree.get_children())} 个关注"))
-            self.root.after(0, lambda: self.update_status(f"✅ 完成！成功取消关注 {success_count} 个用户"))
-            self.root.after(0, lambda: messagebox.showinfo("🎉 完成", f"成功取消关注 {success_count} 个用户"))
+            self.ui.set_status(f"✅ 完成！成功取消关注 {success_count} 个用户")
+            self.ui.post(self.finish_batch_unfollow, success_count)
         
         thread = threading.Thread(target=unfollow_thread)
         thread.daemon = True
         thread.start()
     
+    def finish_batch_unfollow(self, success_count):
+        self.batch_unfollow_button.config(state="normal")
+        self.update_count_label()
+        messagebox.showinfo("🎉 完成", f"成功取消关注 {success_count} 个用户")
+    
     def export_list(self):
-        selected_items = [item for item, checked in self.checked_items.items() if checked]
-        if not selected_items:
+        selected_mids = [mid for mid in self.selection.selected_mids() if mid in self.mid_items]
+        if not selected_mids:
             messagebox.showwarning("⚠️ 警告", "请先选择要导出的关注用户")
             return
         
         try:
-            # 只导出重要的数据字段
-            simplified_list = []
-            for item_id in selected_items:
-                # 从数据映射获取完整的用户数据
-                user = self.item_data.get(item_id)
-                if user:
-                    simplified_user = {
-                        '用户名': user.get('uname', '未知'),
-                        'UID': user.get('mid', ''),
-                        '关注时间': user.get('mtime_str', '未知'),
-                        '关注时间戳': user.get('mtime', ''),
-                        '签名': user.get('sign', '').strip() or '暂无签名',
-                        '官方认证': user.get('official_verify', {}).get('desc', '') if user.get('official_verify') else '',
-                        '头像链接': user.get('face', '')
-                    }
-                    simplified_list.append(simplified_user)
-            
-            localtime = time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime())
-            filename = f"bilibili_following_{localtime}_{len(simplified_list)}_users.json"
+            # 从数据映射逐个读取完整的用户数据，直接写入文件，只导出重要的数据字段
+            users = (self.item_data[self.mid_items[mid]] for mid in selected_mids)
             # 将文件保存到应用程序目录
-            file_path = os.path.join(get_app_dir(), filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(simplified_list, f, indent=2, ensure_ascii=False)
+            result = export_users(users, ['simplified'], get_app_dir())['simplified']
+            filename = os.path.basename(result['path'])
             
-            messagebox.showinfo("🎉 成功", f"关注列表已导出到:\n{file_path}\n\n📊 已导出 {len(simplified_list)} 个用户的重要信息")
+            messagebox.showinfo("🎉 成功", f"关注列表已导出到:\n{result['path']}\n\n📊 已导出 {result['count']} 个用户的重要信息")
             self.update_status(f"📥 列表已导出到 {filename}")
         except Exception as e:
             messagebox.showerror("❌ 错误", f"导出失败：{str(e)}")
@@ -614,7 +1331,11 @@ class BilibiliManagerGUI:
         file_path = filedialog.askopenfilename(
             title="选择要导入的关注列表文件",
             filetypes=[
+                ("关注列表文件", "*.json *.ndjson *.jsonl *.csv *.gz"),
                 ("JSON文件", "*.json"),
+                ("NDJSON文件", "*.ndjson *.jsonl"),
+                ("CSV文件", "*.csv"),
+                ("gzip压缩文件", "*.gz"),
                 ("所有文件", "*.*")
             ],
             initialdir=get_app_dir()
@@ -623,68 +1344,45 @@ class BilibiliManagerGUI:
         if not file_path:
             return
         
-        try:
-            # 读取文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                user_list = json.load(f)
-            
-            if not isinstance(user_list, list):
-                messagebox.showerror("❌ 错误", "文件格式不正确，应该是包含用户列表的JSON数组")
-                return
-            
-            if not user_list:
-                messagebox.showerror("❌ 错误", "文件中没有用户数据")
+        self.update_status(f"📂 正在读取 {os.path.basename(file_path)}...")
+        # 本次运行中已从服务器获取关注列表时，解析时直接剔除已关注的用户
+        following_mids = {user.mid for user in self.following_list} if self.following_is_live else ()
+        
+        def parse_thread():
+            stats = {}
+            try:
+                # 边读边解析，重复的 UID 在解析时去重
+                parsed_users = list(iter_import_users(file_path, following_mids, stats))
+            except ValueError as e:
+                self.ui.post(messagebox.showerror, "❌ 错误", f"文件格式不正确：{str(e)}")
                 return
-            
-            # 解析用户数据
-            parsed_users = self.parse_user_data(user_list)
-            
-            if not parsed_users:
-                messagebox.showerror("❌ 错误", "文件中没有找到有效的用户数据")
+            except Exception as e:
+                self.ui.post(messagebox.showerror, "❌ 错误", f"读取文件失败：{str(e)}")
                 return
-            
-            # 打开选择界面
-            self.show_import_selection_window(parsed_users, file_path)
-            
-        except json.JSONDecodeError:
-            messagebox.showerror("❌ 错误", "文件不是有效的JSON格式")
-        except Exception as e:
-            messagebox.showerror("❌ 错误", f"读取文件失败：{str(e)}")
+            self.ui.post(self.on_import_file_parsed, parsed_users, file_path, stats)
+        
+        thread = threading.Thread(target=parse_thread)
+        thread.daemon = True
+        thread.start()
     
-    def parse_user_data(self, user_list):
-        """解析用户数据，提取关键信息"""
-        parsed_users = []
+    def on_import_file_parsed(self, parsed_users, file_path, stats):
+        """导入文件解析完成后打开选择界面"""
+        if not stats['total']:
+            messagebox.showerror("❌ 错误", "文件中没有用户数据")
+            return
         
-        for user in user_list:
-            user_info = {}
-            
-            # 检查是否是简化版格式（中文字段名）
-            if 'UID' in user:
-                user_info['uid'] = user.get('UID')
-                user_info['username'] = user.get('用户名', '未知用户')
-                user_info['signature'] = user.get('签名', '')
-                user_info['follow_time'] = user.get('关注时间', '')
-            
-            # 检查是否是原始格式（英文字段名）
-            elif 'mid' in user:
-                user_info['uid'] = user.get('mid')
-                user_info['username'] = user.get('uname', '未知用户')
-                user_info['signature'] = user.get('sign', '')
-                user_info['follow_time'] = user.get('mtime_format', '')
-            
+        if not parsed_users:
+            if stats['excluded']:
+                messagebox.showinfo("💡 提示", f"文件中的 {stats['excluded']} 个UP主均已关注，无需再次关注")
             else:
-                continue  # 跳过格式不正确的条目
-            
-            # 确保UID是整数
-            try:
-                user_info['uid'] = int(user_info['uid'])
-                parsed_users.append(user_info)
-            except (ValueError, TypeError):
-                continue  # 跳过UID无效的条目
+                messagebox.showerror("❌ 错误", "文件中没有找到有效的用户数据")
+            return
         
-        return parsed_users
+        self.update_status(f"📂 已从文件中读取 {len(parsed_users)} 个UP主")
+        # 打开选择界面
+        self.show_import_selection_window(parsed_users, file_path, stats['excluded'])
     
-    def show_import_selection_window(self, users_data, file_path):
+    def show_import_selection_window(self, users_data, file_path, skipped_count=0):
         """显示导入选择窗口"""
         # 创建新窗口
         selection_window = tk.Toplevel(self.root)
@@ -718,8 +1416,11 @@ class BilibiliManagerGUI:
                               bg=self.colors['bg_light'])
         title_label.pack()
         
+        subtitle_text = f"从文件 {os.path.basename(file_path)} 中找到 {len(users_data)} 个UP主"
+        if skipped_count:
+            subtitle_text += f"（已跳过 {skipped_count} 个已关注的UP主）"
         subtitle_label = tk.Label(title_frame,
-                                 text=f"从文件 {os.path.basename(file_path)} 中找到 {len(users_data)} 个UP主",
+                                 text=subtitle_text,
                                  font=("Microsoft YaHei UI", 10),
                                  fg=self.colors['text_secondary'],
                                  bg=self.colors['bg_light'])
@@ -734,7 +1435,7 @@ class BilibiliManagerGUI:
         left_buttons.pack(side=tk.LEFT)
         
         select_all_btn = tk.Button(left_buttons, text="全选",
-                                  command=lambda: self.selection_select_all(selection_tree, users_data),
+                                  command=lambda: self.selection_select_all(selection_tree),
                                   bg='#F0F0F0',
                                   fg=self.colors['text_primary'],
                                   font=('Microsoft YaHei UI', 9),
@@ -779,7 +1480,6 @@ class BilibiliManagerGUI:
         selection_tree = ttk.Treeview(tree_frame,
                                      columns=("username", "uid", "signature", "follow_time"),
                                      show="tree headings",
-                                     yscrollcommand=v_scrollbar.set,
                                      height=20)
         selection_tree.pack(fill=tk.BOTH, expand=True)
         
@@ -798,36 +1498,41 @@ class BilibiliManagerGUI:
         selection_tree.column("signature", width=300, minwidth=200)
         selection_tree.column("follow_time", width=150, minwidth=120)
         
-        # 存储选中状态
-        checked_users = {}
+        # 按 UID 存储选中状态，只重绘可见行
+        selection = SelectionModel()
+        selection.set_present(user['uid'] for user in users_data)
+        item_uids = {}
+        painter = CheckboxPainter(selection_window, selection_tree, selection, item_uids)
+        selection_tree.configure(yscrollcommand=painter.yscrollcommand(v_scrollbar))
+        
+        # 填充数据，分批插入，窗口立即显示
+        rows = [("☐",
+                 (user['username'],
+                  user['uid'],
+                  user['signature'][:50] + "..." if len(user['signature']) > 50 else user['signature'],
+                  user['follow_time']),
+                 user['uid']) for user in users_data]
         
-        # 填充数据
-        for user in users_data:
-            item_id = selection_tree.insert("", tk.END,
-                                           text="☐",
-                                           values=(user['username'],
-                                                  user['uid'],
-                                                  user['signature'][:50] + "..." if len(user['signature']) > 50 else user['signature'],
-                                                  user['follow_time']))
-            checked_users[item_id] = False
+        def on_rows_inserted(items):
+            for item_id, uid in items:
+                item_uids[item_id] = uid
+            painter.invalidate()
+        
+        self.enqueue_rows(selection_tree, rows, on_rows_inserted)
         
         # 点击事件处理
         def on_item_click(event):
             region = selection_tree.identify_region(event.x, event.y)
             item = selection_tree.identify_row(event.y)
             
-            if item and region == "tree":
+            if item and region == "tree" and item in item_uids:
                 # 切换选中状态
-                checked_users[item] = not checked_users[item]
-                
-                if checked_users[item]:
-                    selection_tree.item(item, text="☑")
-                else:
-                    selection_tree.item(item, text="☐")
+                checked = selection.toggle(item_uids[item])
+                selection_tree.item(item, text="☑" if checked else "☐")
+                painter.mark(item, item_uids[item])
                 
                 # 更新统计
-                selected_count = sum(checked_users.values())
-                stats_label.config(text=f"已选择: {selected_count} 个")
+                stats_label.config(text=f"已选择: {selection.count()} 个")
         
         selection_tree.bind("<Button-1>", on_item_click)
         
@@ -850,7 +1555,7 @@ class BilibiliManagerGUI:
         # 确认关注按钮
         confirm_btn = tk.Button(button_frame, text="✅ 确认关注",
                                command=lambda: self.confirm_import_selection(
-                                   selection_window, selection_tree, users_data, checked_users, file_path),
+                                   selection_window, users_data, selection, file_path),
                                bg=self.colors['success'],
                                fg='white',
                                font=('Microsoft YaHei UI', 10, 'bold'),
@@ -863,31 +1568,25 @@ class BilibiliManagerGUI:
         # 存储引用以便在其他方法中使用
         self.selection_tree = selection_tree
         self.selection_stats_label = stats_label
-        self.selection_checked_users = checked_users
+        self.import_selection = selection
+        self.import_checkbox_painter = painter
     
-    def selection_select_all(self, tree, users_data):
+    def selection_select_all(self, tree):
         """全选所有用户"""
-        for item in self.selection_checked_users:
-            self.selection_checked_users[item] = True
-            tree.item(item, text="☑")
-        
-        self.selection_stats_label.config(text=f"已选择: {len(users_data)} 个")
+        self.import_selection.select_all()
+        self.import_checkbox_painter.schedule()
+        self.selection_stats_label.config(text=f"已选择: {self.import_selection.count()} 个")
     
     def selection_select_none(self, tree):
         """取消全选"""
-        for item in self.selection_checked_users:
-            self.selection_checked_users[item] = False
-            tree.item(item, text="☐")
-        
+        self.import_selection.clear()
+        self.import_checkbox_painter.schedule()
         self.selection_stats_label.config(text="已选择: 0 个")
     
-    def confirm_import_selection(self, window, tree, users_data, checked_users, file_path):
+    def confirm_import_selection(self, window, users_data, selection, file_path):
         """确认导入选择的用户"""
-        # 获取选中的用户
-        selected_users = []
-        for i, (item_id, is_checked) in enumerate(checked_users.items()):
-            if is_checked:
-                selected_users.append(users_data[i])
+        # 获取选中的用户，按文件中的顺序
+        selected_users = [user for user in users_data if selection.is_selected(user['uid'])]
         
         if not selected_users:
             messagebox.showwarning("⚠️ 提示", "请至少选择一个要关注的UP主")
@@ -896,7 +1595,7 @@ class BilibiliManagerGUI:
         # 确认操作
         if not messagebox.askyesno("🔔 确认批量关注", 
                                   f"确定要关注选中的 {len(selected_users)} 个UP主吗？\n\n"
-                                  f"⚠️ 此操作将会逐个关注这些用户\n"
+                                  f"⚠️ 此操作将会分批关注这些用户\n"
                                   f"⏱️ 预计需要 {len(selected_users)//10 + 1}-{len(selected_users)//5 + 1} 分钟",
                                   icon="question"):
             return
@@ -904,65 +1603,127 @@ class BilibiliManagerGUI:
         # 关闭选择窗口
         window.destroy()
         
-        # 提取UID列表
-        uids_to_follow = [user['uid'] for user in selected_users]
-        
         # 开始批量关注
-        self.start_batch_follow(uids_to_follow, file_path)
+        self.start_batch_follow(selected_users, file_path)
     
-    def start_batch_follow(self, uids_to_follow, file_path):
-        """开始批量关注操作"""
+    def start_batch_follow(self, users_to_follow, file_path):
+        """开始批量关注操作
+
+        Args:
+            users_to_follow: 导入文件中选中的用户 {uid, username, signature, follow_time}
+            file_path: 导入文件路径
+        """
         if not self.api:
             messagebox.showerror("❌ 错误", "API未初始化，请先设置登录")
             return
+        
+        # 本次运行中已从服务器获取关注列表时在本地比对；
+        # 只有本地缓存时可能已过时（其他设备上取消了关注），由工作线程批量查询关系
+        following_mids = {user.mid for user in self.following_list} if self.following_is_live else None
             
+        self.import_follow_button.config(state="disabled")
+        self.update_status("🔍 正在检查已关注的用户...")
+        
         def follow_thread():
-            self.root.after(0, lambda: self.import_follow_button.config(state="disabled"))
-            self.root.after(0, lambda: self.update_status("🔄 正在批量关注用户..."))
+            uids_to_follow = [user['uid'] for user in users_to_follow]
+            pending_uids, skipped = self.api.filter_unfollowed(uids_to_follow, following_mids)
+            self.ui.set_status("🔄 正在批量关注用户...")
             
-            success_count = 0
-            failed_count = 0
-            total = len(uids_to_follow)
+            total = len(pending_uids)
+            done_count = 0
             
-            for i, uid in enumerate(uids_to_follow):
-                try:
-                    self.root.after(0, lambda current=i+1, total=total: 
-                                  self.update_status(f"🔄 正在关注用户 ({current}/{total})..."))
-                    
-                    if self.api and hasattr(self.api, "follow_user") and callable(getattr(self.api, "follow_user")):
-                        if self.api.follow_user(uid):
-                            success_count += 1
-                        else:
-                            failed_count += 1
-                    else:
-                        failed_count += 1
-                    
-                    # 避免操作过快
-                    time.sleep(1.0)  # 固定延迟1秒
-                    
-                except Exception as e:
-                    failed_count += 1
-                    print(f"关注用户 {uid} 失败: {e}")  # 使用print替代logger
+            def on_progress(uid, success):
+                nonlocal done_count
+                done_count += 1
+                self.ui.set_status(f"🔄 正在关注用户 ({done_count}/{total})...")
             
-            self.root.after(0, lambda: self.import_follow_button.config(state="normal"))
+            success_count = 0
+            failed_count = total
+            if pending_uids:
+                job_id = self.api.start_job(RELATION_FOLLOW, pending_uids, f'从 {os.path.basename(file_path)} 导入关注')
+                # 关注成功的用户先以文件中的名称写入本地存储，下次同步时更新为服务器数据
+                now = int(time.time())
+                users = {user['uid']: FollowingUser(user['uid'], user['username'], user['signature'], now)
+                         for user in users_to_follow}
+                outcome = self.api.run_job(job_id, on_progress, users)
+                success_count = outcome['stats']['success']
+                failed_count = outcome['stats']['failed']
+            
+            self.ui.post(lambda: self.import_follow_button.config(state="normal"))
             
             # 显示结果
             result_msg = f"🎉 批量关注完成！\n\n✅ 成功关注: {success_count} 个用户\n"
             if failed_count > 0:
                 result_msg += f"❌ 失败: {failed_count} 个用户\n"
+            if skipped:
+                result_msg += f"⏭️ 已关注而跳过: {len(skipped)} 个用户\n"
             result_msg += f"📁 源文件: {os.path.basename(file_path)}"
             
-            self.root.after(0, lambda: messagebox.showinfo("🎉 完成", result_msg))
-            self.root.after(0, lambda: self.update_status(f"✅ 批量关注完成！成功 {success_count} 个，失败 {failed_count} 个"))
+            self.ui.set_status(f"✅ 批量关注完成！成功 {success_count} 个，失败 {failed_count} 个")
+            self.ui.post(messagebox.showinfo, "🎉 完成", result_msg)
             
             # 刷新关注列表
             if success_count > 0:
-                self.root.after(2000, self.refresh_following)  # 2秒后自动刷新
+                self.ui.post(self.root.after, 2000, self.refresh_following)  # 2秒后自动刷新
         
         thread = threading.Thread(target=follow_thread)
         thread.daemon = True
         thread.start()
     
+    def resume_job(self):
+        """继续执行中途退出的批量任务"""
+        if not self.api:
+            messagebox.showerror("❌ 错误", "API未初始化，请先设置登录")
+            return
+        
+        pending_jobs = self.api.pending_jobs()
+        if not pending_jobs:
+            messagebox.showinfo("💡 提示", "没有需要恢复的任务")
+            return
+        
+        job = pending_jobs[-1]
+        action = "关注" if job['act'] == RELATION_FOLLOW else "取消关注"
+        uname = self.api.store.get_meta(self.api.owner).get('uname')
+        account = f"{uname} (ID: {self.api.owner})" if uname else f"ID: {self.api.owner}"
+        if not messagebox.askyesno("▶️ 恢复任务", 
+                                  f"发现账号 {account} 未完成的任务：{job['description']}\n\n"
+                                  f"已完成 {len(job['results'])} 个，剩余 {len(job['remaining'])} 个待{action}\n\n"
+                                  f"是否继续执行？",
+                                  icon="question"):
+            return
+        
+        self.resume_job_button.config(state="disabled")
+        
+        def resume_thread():
+            total = len(job['remaining'])
+            done_count = 0
+            
+            def on_progress(uid, success):
+                nonlocal done_count
+                done_count += 1
+                self.ui.set_status(f"🔄 正在{action}用户 ({done_count}/{total})...")
+            
+            outcome = self.api.run_job(job['job_id'], on_progress)
+            stats = outcome['stats']
+            
+            self.ui.post(lambda: self.resume_job_button.config(state="normal"))
+            if outcome.get('incomplete'):
+                self.ui.set_status(f"⚠️ 读取关注列表失败，任务未完成：成功 {stats['success']} 个，失败 {stats['failed']} 个")
+                self.ui.post(messagebox.showwarning, "⚠️ 任务未完成",
+                             f"读取关注列表中途失败，任务已保存，可稍后再次恢复。\n\n"
+                             f"✅ 成功{action}: {stats['success']} 个用户\n"
+                             f"❌ 失败: {stats['failed']} 个用户")
+                return
+            self.ui.set_status(f"✅ 任务已完成！成功 {stats['success']} 个，失败 {stats['failed']} 个")
+            self.ui.post(messagebox.showinfo, "🎉 完成",
+                         f"任务已完成！\n\n✅ 成功{action}: {stats['success']} 个用户\n"
+                         f"❌ 失败: {stats['failed']} 个用户")
+            self.ui.post(self.root.after, 2000, self.refresh_following)
+        
+        thread = threading.Thread(target=resume_thread)
+        thread.daemon = True
+        thread.start()
+    
     def update_status(self, message):
         self.status_bar.config(text=message)
     
@@ -1000,18 +1761,43 @@ Copyright © 2025 一懒众衫小 (Noeky)
             return
             
         if region == "tree":  # 只有点击在图标区域时才切换勾选状态
-            # 切换选中状态
-            self.toggle_check(item)
+            if event.state & 0x0001 and self.check_anchor and self.check_anchor != item:
+                self.range_check(self.check_anchor, item)
+            else:
+                # 切换选中状态
+                self.toggle_check(item)
+                self.check_anchor = item
         # 其他区域的点击不处理，让Treeview默认的选择机制生效
     
+    def range_check(self, anchor, item):
+        """按表格当前的显示顺序（排序、过滤后），把锚点行到点击行之间的行设为与锚点相同的勾选状态"""
+        rows = self.tree.get_children()
+        try:
+            start, end = sorted((rows.index(anchor), rows.index(item)))
+        except ValueError:
+            # 锚点行已被删除或被搜索过滤隐藏，改为普通点击
+            self.toggle_check(item)
+            self.check_anchor = item
+            return
+        
+        mask = self.item_mask(rows[start:end + 1])
+        if self.selection.is_selected(self.item_mids[anchor]):
+            self.selection.select_mask(mask)
+            self.selection_changed(f"✅ 已勾选 {end - start + 1} 个项目")
+        else:
+            self.selection.deselect_mask(mask)
+            self.selection_changed(f"✅ 已取消勾选 {end - start + 1} 个项目")
+    
     def toggle_check(self, item):
         """切换选中状态"""
-        # 获取当前状态并切换
-        is_checked = self.checked_items.get(item, False)
-        self.checked_items[item] = not is_checked
+        mid = self.item_mids.get(item)
+        if mid is None:
+            return
         
-        # 更新显示
-        if self.checked_items[item]:
+        # 切换状态并更新显示
+        checked = self.selection.toggle(mid)
+        self.checkbox_painter.mark(item, mid)
+        if checked:
             self.tree.item(item, text="☑")
             # 如果点击选中，也添加到 Treeview 的 selection
             self.tree.selection_add(item)
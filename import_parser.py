@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""关注列表导入文件的流式解析
+
+支持的格式：
+- JSON 数组：本程序导出的原始格式或简化格式
+- NDJSON：每行一个用户
+- CSV：首行为列名，列名可以是 mid/uname 或 UID/用户名
+- NewPipe 订阅文件：从 subscriptions[*].url 中的 space.bilibili.com/<mid> 提取 UID
+- 以上格式的 gzip 压缩文件
+
+文件按块读取，每解析出一个用户就立即返回，不会把整个文件读入内存；UID 在解析时去重。
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+
+from following_user import format_mtime
+
+CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# NewPipe 中B站的 service_id
+NEWPIPE_BILIBILI_SERVICE = 5
+
+SPACE_URL_PATTERN = re.compile(r'space\.bilibili\.com/(\d+)')
+
+_WHITESPACE = ' \t\r\n'
+
+
+def open_import_file(file_path: str) -> TextIO:
+    """以文本方式打开导入文件，按文件头自动识别 gzip 压缩"""
+    with open(file_path, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.open(file_path, 'rb'), encoding='utf-8-sig', newline='')
+    return open(file_path, 'r', encoding='utf-8-sig', newline='')
+
+
+class _JSONStream:
+    """按块读取文本并逐个解码 JSON 值"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """读取下一块，已到文件末尾时返回 False"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"文件格式不正确：应为 '{char}'，实际为 '{self.peek() or '文件结尾'}'")
+        self.pos += 1
+
+    def value(self):
+        """解码下一个完整的 JSON 值"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 数字可能被块边界截断，后面还有字符或已到文件末尾才算完整
+            if end < len(self.buffer) or not self._fill():
+                self.pos = end
+                return value
+
+
+def _iter_array(parser: _JSONStream) -> Iterator:
+    """逐个返回数组中的元素"""
+    parser.expect('[')
+    if parser.peek() == ']':
+        parser.pos += 1
+        return
+    while True:
+        yield parser.value()
+        char = parser.peek()
+        parser.pos += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError("文件格式不正确：数组元素之间缺少逗号")
+
+
+def _iter_object(parser: _JSONStream) -> Iterator:
+    """逐个返回对象中的用户
+
+    对象中有 subscriptions 数组时（NewPipe 订阅文件）逐个返回其中的条目，
+    否则整个对象就是一个用户（NDJSON 的一行）。
+    """
+    parser.expect('{')
+    record = {}
+    has_subscriptions = False
+    if parser.peek() == '}':
+        parser.pos += 1
+    else:
+        while True:
+            key = parser.value()
+            parser.expect(':')
+            if key == 'subscriptions' and parser.peek() == '[':
+                has_subscriptions = True
+                yield from _iter_array(parser)
+            else:
+                record[key] = parser.value()
+            char = parser.peek()
+            parser.pos += 1
+            if char == '}':
+                break
+            if char != ',':
+                raise ValueError("文件格式不正确：对象成员之间缺少逗号")
+    if not has_subscriptions:
+        yield record
+
+
+def iter_json_records(stream: TextIO) -> Iterator:
+    """逐个返回 JSON 数组、NDJSON 或 NewPipe 订阅文件中的条目"""
+    parser = _JSONStream(stream)
+    while True:
+        char = parser.peek()
+        if not char:
+            return
+        if char == '[':
+            yield from _iter_array(parser)
+        elif char == '{':
+            yield from _iter_object(parser)
+        else:
+            yield parser.value()
+
+
+def iter_csv_records(stream: TextIO) -> Iterator[Dict]:
+    """逐行返回 CSV 文件中的条目"""
+    for row in csv.DictReader(stream):
+        yield {key.strip(): value for key, value in row.items() if key}
+
+
+class _Prepend:
+    """把已读出的字符放回流的开头"""
+
+    def __init__(self, head: str, stream: TextIO):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size: int = -1) -> str:
+        head, self.head = self.head, ''
+        if size is None or size < 0:
+            return head + self.stream.read()
+        return head + self.stream.read(max(size - len(head), 0))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.stream.readline()
+        head, self.head = self.head, ''
+        line = head + line
+        if not line:
+            raise StopIteration
+        return line
+
+
+def iter_records(stream: TextIO) -> Iterator:
+    """按内容识别文件格式，逐个返回原始条目"""
+    head = stream.read(1)
+    while head and head in _WHITESPACE:
+        head = stream.read(1)
+    rest = _Prepend(head, stream)
+    if head in ('[', '{'):
+        return iter_json_records(rest)
+    return iter_csv_records(rest)
+
+
+def normalize_user(record) -> Optional[Dict]:
+    """把各种格式的条目统一为 {uid, username, signature, follow_time}，无法识别时返回 None"""
+    if isinstance(record, bool):
+        return None
+    if isinstance(record, (int, str)):
+        record = {'mid': record}
+    if not isinstance(record, dict):
+        return None
+
+    if record.get('UID') not in (None, ''):
+        # 简化版格式（中文字段名）
+        uid = record['UID']
+        username = record.get('用户名')
+        signature = record.get('签名')
+        follow_time = record.get('关注时间')
+    elif record.get('mid') not in (None, ''):
+        # 原始格式（英文字段名）
+        uid = record['mid']
+        username = record.get('uname')
+        signature = record.get('sign')
+        follow_time = record.get('mtime_str') or record.get('mtime_format')
+        if not follow_time and isinstance(record.get('mtime'), int) and record['mtime']:
+            follow_time = format_mtime(record['mtime'])
+    elif record.get('url'):
+        # NewPipe 订阅条目
+        if record.get('service_id') not in (None, '', NEWPIPE_BILIBILI_SERVICE, str(NEWPIPE_BILIBILI_SERVICE)):
+            return None
+        match = SPACE_URL_PATTERN.search(str(record['url']))
+        if not match:
+            return None
+        uid = match.group(1)
+        username = record.get('name')
+        signature = ''
+        follow_time = ''
+    else:
+        return None
+
+    try:
+        uid = int(str(uid).strip())
+    except ValueError:
+        return None
+    if uid <= 0:
+        return None
+
+    return {
+        'uid': uid,
+        'username': username or '未知用户',
+        'signature': signature or '',
+        'follow_time': follow_time or '',
+    }
+
+
+def iter_import_users(file_path: str, exclude: Iterable[int] = (),
+                      stats: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+    """逐个返回导入文件中的用户，重复的 UID 只返回第一次出现的
+
+    Args:
+        file_path: 导入文件路径
+        exclude: 需要跳过的 UID，例如已关注的用户
+        stats: 传入字典时累计 total（条目数）、invalid（无法识别）、
+               duplicate（重复）和 excluded（被跳过）的数量
+    """
+    if stats is None:
+        stats = {}
+    for key in ('total', 'invalid', 'duplicate', 'excluded'):
+        stats.setdefault(key, 0)
+
+    excluded = set(exclude)
+    seen = set()
+    with open_import_file(file_path) as stream:
+        for record in iter_records(stream):
+            stats['total'] += 1
+            user = normalize_user(record)
+            if user is None:
+                stats['invalid'] += 1
+                continue
+            uid = user['uid']
+            if uid in seen:
+                stats['duplicate'] += 1
+                continue
+            seen.add(uid)
+            if uid in excluded:
+                stats['excluded'] += 1
+                continue
+            yield user
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+
+class JobJournal:
+    """批量任务日志
+
+    每个批量操作以追加方式写入 JSON Lines 文件：
+    plan 记录计划操作的用户ID及所属账号，result 记录每个用户的结果，done 标记任务完成。
+    日志由本机所有登录过的账号共用，查询时按账号过滤，不会在其他账号下恢复任务。
+    边读取列表边执行的任务先以 open 方式创建，读完全部列表后写入 closed；
+    计划尚未写完的任务恢复时需要重新读取列表。
+    程序中途退出后，可从最后一条已写入的记录继续执行。
+    """
+
+    def __init__(self, path: str):
+        """初始化任务日志
+
+        Args:
+            path: 日志文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def _append(self, entry: Dict):
+        """追加一条记录并立即落盘"""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if not self._tail_checked:
+                line = self._terminate_torn_line() + line
+                self._tail_checked = True
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _terminate_torn_line(self) -> str:
+        """上次进程在写入中途退出时，先补上换行，避免与新记录粘连"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                return '' if f.read(1) == b'\n' else '\n'
+        except OSError:
+            return ''
+
+    def create_job(self, act: int, fids: Iterable[int], description: str = '', open_plan: bool = False,
+                   owner: str = '') -> str:
+        """创建任务并写入计划
+
+        Args:
+            act: 操作类型（1 关注，2 取消关注）
+            fids: 计划操作的用户ID
+            description: 任务说明
+            open_plan: 计划是否还会继续追加，追加完成后调用 close_plan
+            owner: 执行任务的账号ID（DedeUserID）
+
+        Returns:
+            任务ID
+        """
+        job_id = time.strftime("%Y%m%d%H%M%S") + '-' + uuid.uuid4().hex[:6]
+        self._append({
+            'type': 'plan',
+            'job': job_id,
+            'act': act,
+            'owner': owner,
+            'description': description,
+            'created': int(time.time()),
+            'fids': list(fids),
+            'open': open_plan
+        })
+        return job_id
+
+    def extend_plan(self, job_id: str, fids: Iterable[int]):
+        """为任务追加计划操作的用户ID"""
+        self._append({'type': 'plan', 'job': job_id, 'fids': list(fids)})
+
+    def close_plan(self, job_id: str):
+        """计划已全部写入"""
+        self._append({'type': 'closed', 'job': job_id})
+
+    def record(self, job_id: str, fid: int, success: bool):
+        """记录单个用户的操作结果"""
+        self._append({'type': 'result', 'job': job_id, 'fid': fid, 'ok': success})
+
+    def finish(self, job_id: str):
+        """标记任务完成，所有任务都完成后清空日志"""
+        self._append({'type': 'done', 'job': job_id})
+        with self._lock:
+            if not self._pending(self._replay()):
+                os.remove(self.path)
+
+    def _replay(self) -> Dict[str, Dict]:
+        """按顺序重放日志，得到每个任务的状态"""
+        jobs = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 进程中断时最后一行可能不完整
+
+                    job = jobs.get(entry.get('job'))
+                    if entry.get('type') == 'plan':
+                        if job is None:
+                            job = jobs[entry['job']] = {
+                                'job_id': entry['job'],
+                                'act': entry.get('act'),
+                                'owner': entry.get('owner'),
+                                'description': entry.get('description', ''),
+                                'created': entry.get('created'),
+                                'fids': [],
+                                'results': {},
+                                'open': entry.get('open', False),
+                                'finished': False
+                            }
+                        job['fids'].extend(entry.get('fids', []))
+                    elif job is None:
+                        continue
+                    elif entry.get('type') == 'result':
+                        job['results'][entry['fid']] = entry['ok']
+                    elif entry.get('type') == 'closed':
+                        job['open'] = False
+                    elif entry.get('type') == 'done':
+                        job['finished'] = True
+        except FileNotFoundError:
+            pass
+        return jobs
+
+    @staticmethod
+    def _pending(jobs: Dict[str, Dict]) -> List[Dict]:
+        pending = []
+        for job in jobs.values():
+            if job['finished']:
+                continue
+            job['remaining'] = [fid for fid in dict.fromkeys(job['fids']) if fid not in job['results']]
+            pending.append(job)
+        return pending
+
+    def get_job(self, job_id: str, owner: Optional[str] = None) -> Optional[Dict]:
+        """获取任务状态，包含尚未执行的用户ID（remaining）和计划是否未写完（open）
+
+        Args:
+            job_id: 任务ID
+            owner: 只查找该账号的任务，为 None 时不限账号
+        """
+        for job in self.pending_jobs(owner):
+            if job['job_id'] == job_id:
+                return job
+        return None
+
+    def pending_jobs(self, owner: Optional[str] = None) -> List[Dict]:
+        """获取未完成的任务
+
+        Args:
+            owner: 只返回该账号的任务，为 None 时返回全部；没有记录账号的旧任务不属于任何账号
+        """
+        with self._lock:
+            jobs = self._pending(self._replay())
+        if owner is None:
+            return jobs
+        return [job for job in jobs if job['owner'] == owner]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+GENERATE_URL = "https://passport.bilibili.com/x/passport-login/web/qrcode/generate"
+POLL_URL = "https://passport.bilibili.com/x/passport-login/web/qrcode/poll"
+
+# 轮询二维码状态的返回码
+QR_SUCCESS = 0
+QR_EXPIRED = 86038
+QR_SCANNED = 86090
+QR_NOT_SCANNED = 86101
+
+QR_STATUS_TEXT = {
+    QR_SUCCESS: "登录成功",
+    QR_EXPIRED: "二维码已失效",
+    QR_SCANNED: "已扫码，请在手机上确认登录",
+    QR_NOT_SCANNED: "请使用B站手机客户端扫描二维码",
+}
+
+COOKIE_NAMES = ['SESSDATA', 'bili_jct', 'DedeUserID', 'DedeUserID__ckMd5']
+
+
+class BilibiliQRLogin:
+    """基于B站通行证二维码接口的登录，无需浏览器"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "Referer": "https://www.bilibili.com/"
+        })
+
+    def generate(self) -> Tuple[str, str]:
+        """申请登录二维码
+
+        Returns:
+            (二维码内容链接, qrcode_key)
+        """
+        data = self.session.get(GENERATE_URL, timeout=10).json()
+        if data['code'] != 0:
+            raise Exception(f"获取登录二维码失败: {data['message']}")
+        return data['data']['url'], data['data']['qrcode_key']
+
+    def poll(self, qrcode_key: str) -> Tuple[int, Dict]:
+        """查询一次二维码状态
+
+        Returns:
+            (状态码, 接口返回的 data)
+        """
+        data = self.session.get(POLL_URL, params={'qrcode_key': qrcode_key}, timeout=10).json()
+        if data['code'] != 0:
+            raise Exception(f"查询二维码状态失败: {data['message']}")
+        return data['data']['code'], data['data']
+
+    def _collect_cookies(self, data: Dict) -> Dict:
+        """从会话 Cookie 中提取凭据，缺失时从跳转链接的参数中补全"""
+        cookies = {name: self.session.cookies.get(name) for name in COOKIE_NAMES if self.session.cookies.get(name)}
+        query = parse_qs(urlparse(data.get('url', '')).query)
+        for name in COOKIE_NAMES:
+            if name not in cookies and query.get(name):
+                cookies[name] = query[name][0]
+        if data.get('refresh_token'):
+            cookies['refresh_token'] = data['refresh_token']
+        return cookies
+
+    def wait_for_login(self, qrcode_key: str, timeout: float = 180, interval: float = 1.0,
+                       status_callback: Optional[Callable[[int, str], None]] = None,
+                       cancelled: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """轮询直到扫码登录成功、二维码失效或超时
+
+        Args:
+            qrcode_key: generate 返回的 qrcode_key
+            timeout: 最长等待秒数
+            interval: 轮询间隔秒数
+            status_callback: 状态变化时调用，参数为 (状态码, 说明)
+            cancelled: 返回 True 时停止等待
+
+        Returns:
+            登录凭据，失败时返回 None
+        """
+        last_code = None
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            if cancelled and cancelled():
+                return None
+
+            try:
+                code, data = self.poll(qrcode_key)
+            except Exception as e:
+                print(f"查询二维码状态失败: {e}")
+                time.sleep(interval)
+                continue
+
+            if code != last_code:
+                last_code = code
+                if status_callback:
+                    status_callback(code, QR_STATUS_TEXT.get(code, data.get('message', '')))
+
+            if code == QR_SUCCESS:
+                cookies = self._collect_cookies(data)
+                if 'SESSDATA' in cookies and 'bili_jct' in cookies:
+                    return cookies
+                print("获取凭据失败")
+                return None
+            if code == QR_EXPIRED:
+                return None
+
+            time.sleep(interval)
+
+        print("登录超时")
+        return None
+
+
+def qr_matrix(text: str, border: int = 2) -> List[List[bool]]:
+    """生成二维码点阵，True 表示深色模块"""
+    import qrcode
+
+    qr = qrcode.QRCode(border=border, error_correction=qrcode.constants.ERROR_CORRECT_M)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def render_qr_terminal(matrix: List[List[bool]]) -> str:
+    """用半高方块字符把二维码画到终端，每个字符表示上下两个模块"""
+    lines = []
+    for y in range(0, len(matrix), 2):
+        top = matrix[y]
+        bottom = matrix[y + 1] if y + 1 < len(matrix) else [True] * len(top)
+        line = []
+        for upper, lower in zip(top, bottom):
+            # 深色终端背景上，浅色模块用方块绘制
+            if not upper and not lower:
+                line.append('█')
+            elif not upper:
+                line.append('▀')
+            elif not lower:
+                line.append('▄')
+            else:
+                line.append(' ')
+        lines.append(''.join(line))
+    return '\n'.join(lines)
+
+
+def qr_login_setup() -> bool:
+    """在终端显示二维码完成登录，并写入配置文件"""
+    from auto_login import BilibiliAutoLogin
+
+    login_tool = BilibiliQRLogin()
+    try:
+        url, qrcode_key = login_tool.generate()
+    except Exception as e:
+        print(f"登录失败: {e}")
+        return False
+
+    print(render_qr_terminal(qr_matrix(url)))
+    print("请使用B站手机客户端扫描上方二维码登录")
+
+    cookies = login_tool.wait_for_login(qrcode_key, status_callback=lambda code, text: print(text))
+
+    if cookies and BilibiliAutoLogin().create_config_file(cookies):
+        print("登录成功！")
+        return True
+    else:
+        print("登录失败")
+        return False
+
+
+if __name__ == "__main__":
+    qr_login_setup()
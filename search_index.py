@@ -0,0 +1,77 @@
+from operator import add
+from typing import Dict, Iterable, List, Optional
+
+from following_user import FollowingUser
+
+
+def searchable_text(user: FollowingUser) -> str:
+    """拼接用户的可搜索字段：用户名、UID、签名和认证说明"""
+    fields = (
+        user.uname,
+        str(user.mid),
+        user.sign,
+        user.official_desc,
+    )
+    # 用换行分隔字段，避免跨字段匹配
+    return '\n'.join(fields).casefold()
+
+
+def _bigrams(text: str) -> set:
+    """文本中所有相邻的两个字符"""
+    return set(map(add, text, text[1:]))
+
+
+class SearchIndex:
+    """关注列表的二元组（bigram）搜索索引
+
+    记录每个相邻两字出现在哪些用户的可搜索文本中。
+    查询时取查询词中出现用户最少的二元组作为候选，再逐个校验子串，
+    候选集通常只有几十个用户，上万行的列表也能在一帧内完成过滤。
+    单个字符的查询词没有二元组，直接逐个比对。
+    """
+
+    def __init__(self, users: Iterable[FollowingUser] = ()):
+        self._texts: List[Optional[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self.add(users)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, users: Iterable[FollowingUser]):
+        """追加用户，下标按追加顺序依次递增"""
+        postings = self._postings
+        for user in users:
+            index = len(self._texts)
+            text = searchable_text(user)
+            self._texts.append(text)
+            for gram in _bigrams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [index]
+                else:
+                    posting.append(index)
+
+    def remove(self, indexes: Iterable[int]):
+        """标记用户已删除，不再出现在搜索结果中"""
+        for index in indexes:
+            self._texts[index] = None
+
+    def search(self, query: str) -> List[int]:
+        """查找包含查询词的用户
+
+        Args:
+            query: 查询词，不区分大小写，多个词用空格分隔时需全部匹配
+
+        Returns:
+            匹配用户的下标，按追加顺序排列
+        """
+        terms = query.casefold().split()
+        if not terms:
+            return [index for index, text in enumerate(self._texts) if text is not None]
+
+        texts = self._texts
+        postings = [self._postings.get(gram, ()) for term in terms for gram in _bigrams(term)]
+        candidates = min(postings, key=len) if postings else range(len(texts))
+        return [index for index in candidates
+                if texts[index] is not None and all(term in texts[index] for term in terms)]
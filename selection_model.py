@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class SelectionModel:
+    """以 mid 为键的勾选状态，用 Python 整数作为位图
+
+    每个 mid 首次出现时分配一个固定的位，之后一直不变，刷新列表后勾选状态仍然保留。
+    全选、取消全选、反选、按过滤结果或一段连续的行勾选都是整数位运算，
+    按 64 位一个字并行处理，一万行也只需几百次机器字操作。
+    """
+
+    def __init__(self):
+        self._slots: Dict[int, int] = {}  # mid 到位序号的映射
+        self._mids: List[int] = []        # 位序号到 mid 的映射
+        self._selected = 0                # 已勾选的位
+        self._present = 0                 # 当前列表中存在的位
+
+    def slot(self, mid: int) -> int:
+        """获取 mid 对应的位序号，首次出现时分配"""
+        slot = self._slots.get(mid)
+        if slot is None:
+            slot = self._slots[mid] = len(self._mids)
+            self._mids.append(mid)
+        return slot
+
+    def mask(self, mids: Iterable[int]) -> int:
+        """把一组 mid 转换为位图"""
+        slots = [self.slot(mid) for mid in mids]
+        if not slots:
+            return 0
+        # 先在 bytearray 中置位再整体转换，避免逐个 | 产生大量大整数
+        buffer = bytearray((max(slots) >> 3) + 1)
+        for slot in slots:
+            buffer[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def set_present(self, mids: Iterable[int]):
+        """设置当前列表中存在的用户，不在列表中的用户不计入勾选结果"""
+        self._present = self.mask(mids)
+
+    def add_present(self, mids: Iterable[int]):
+        """追加列表中存在的用户，保留之前的勾选状态"""
+        self._present |= self.mask(mids)
+
+    def remove(self, mids: Iterable[int]):
+        """用户已从列表中移除"""
+        mask = self.mask(mids)
+        self._present &= ~mask
+        self._selected &= ~mask
+
+    def is_selected(self, mid: int) -> bool:
+        slot = self._slots.get(mid)
+        return slot is not None and bool(self._selected >> slot & 1)
+
+    def toggle(self, mid: int) -> bool:
+        """切换单个用户的勾选状态，返回切换后的状态"""
+        self._selected ^= 1 << self.slot(mid)
+        return self.is_selected(mid)
+
+    def select_mask(self, mask: int):
+        self._selected |= mask & self._present
+
+    def deselect_mask(self, mask: int):
+        self._selected &= ~mask
+
+    def select(self, mids: Iterable[int]):
+        self.select_mask(self.mask(mids))
+
+    def deselect(self, mids: Iterable[int]):
+        self.deselect_mask(self.mask(mids))
+
+    def select_all(self):
+        self._selected |= self._present
+
+    def clear(self):
+        self._selected = 0
+
+    def invert(self, mask: Optional[int] = None):
+        """反选，指定 mask 时只反选其中的用户"""
+        if mask is None:
+            mask = self._present
+        self._selected ^= mask & self._present
+
+    def count(self) -> int:
+        return (self._selected & self._present).bit_count()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, mid: int) -> bool:
+        return self.is_selected(mid)
+
+    def __iter__(self) -> Iterator[int]:
+        """按位序号顺序返回已勾选的 mid"""
+        return self.selected_mids()
+
+    def selected_mids(self) -> Iterator[int]:
+        bits = self._selected & self._present
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        for offset, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield self._mids[(offset << 3) + low.bit_length() - 1]
+                byte ^= low
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+import time
+import json
+import unittest
+from unittest import mock
+
+import auto_login
+from browser_cookies import CHROME_EPOCH_OFFSET, read_chrome_cookies, read_firefox_cookies
+
+FAR_FUTURE = int(time.time()) + 86400 * 365
+
+
+class FirefoxCookiesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'cookies.sqlite')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('CREATE TABLE moz_cookies (name TEXT, value TEXT, host TEXT, expiry INTEGER)')
+        conn.executemany('INSERT INTO moz_cookies VALUES (?, ?, ?, ?)', [
+            ('SESSDATA', 'sess', '.bilibili.com', FAR_FUTURE * 1000),
+            ('bili_jct', 'csrf', 'bilibili.com', FAR_FUTURE),
+            ('DedeUserID', '42', 'passport.bilibili.com', FAR_FUTURE),
+            # 只是以 bilibili.com 结尾的其他域名
+            ('SESSDATA', 'evil', '.evilbilibili.com', FAR_FUTURE + 1),
+            ('DedeUserID__ckMd5', 'evil', 'evilbilibili.com', FAR_FUTURE),
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reads_only_bilibili_hosts(self):
+        cookies = read_firefox_cookies(self.db_path)
+        self.assertEqual(cookies, {'SESSDATA': 'sess', 'bili_jct': 'csrf', 'DedeUserID': '42'})
+
+
+class ChromeCookiesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'Cookies')
+        expires_utc = (FAR_FUTURE + CHROME_EPOCH_OFFSET) * 1000000
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('CREATE TABLE meta (key TEXT, value TEXT)')
+        conn.execute("INSERT INTO meta VALUES ('version', '24')")
+        conn.execute('CREATE TABLE cookies (name TEXT, value TEXT, encrypted_value BLOB, '
+                     'host_key TEXT, expires_utc INTEGER)')
+        conn.executemany('INSERT INTO cookies VALUES (?, ?, ?, ?, ?)', [
+            ('SESSDATA', 'sess', b'', '.bilibili.com', expires_utc),
+            ('bili_jct', 'csrf', b'', 'www.bilibili.com', expires_utc),
+            ('DedeUserID', 'evil', b'', 'notbilibili.com', expires_utc),
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reads_only_bilibili_hosts(self):
+        def key_provider(version):
+            raise AssertionError("明文 Cookie 不需要解密")
+
+        cookies = read_chrome_cookies(self.db_path, key_provider)
+        self.assertEqual(cookies, {'SESSDATA': 'sess', 'bili_jct': 'csrf'})
+
+
+class CreateConfigTest(unittest.TestCase):
+    def test_keeps_all_login_cookies(self):
+        cookies = {'SESSDATA': 'sess', 'bili_jct': 'csrf', 'DedeUserID': '42', 'DedeUserID__ckMd5': 'md5'}
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(auto_login, 'get_app_dir', return_value=tmp_dir):
+            self.assertTrue(auto_login.BilibiliAutoLogin().create_config_file(cookies))
+            with open(os.path.join(tmp_dir, 'config.json'), encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['cookies'], cookies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import time
+import tkinter as tk
+import unittest
+from unittest import mock
+
+import bilibili_api
+import gui
+from following_user import FollowingUser
+
+STUB_CONFIG = {
+    'cookies': {'SESSDATA': 'stub', 'bili_jct': 'stub', 'DedeUserID': '1'},
+    'headers': {},
+    'settings': {'batch_size': 50, 'delay_between_requests': 0.01, 'max_retries': 0},
+}
+
+CACHED_USERS = 20000
+
+
+class FirstPaintTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("没有可用的显示器")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp_dir.name, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump(STUB_CONFIG, f)
+
+        patches = [
+            mock.patch.object(gui, 'get_app_dir', return_value=self.tmp_dir.name),
+            mock.patch.object(bilibili_api, 'get_app_dir', return_value=self.tmp_dir.name),
+            # 登录验证不联网，直接返回未登录
+            mock.patch.object(bilibili_api.BilibiliAPI, 'get_user_info', return_value={}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        # 本地缓存一个较大的关注列表，它不应拖慢首次绘制
+        api = bilibili_api.BilibiliAPI()
+        api.save_following_snapshot([FollowingUser(mid, f'用户{mid}', mtime=mid) for mid in range(1, CACHED_USERS + 1)])
+        api.store.close()
+
+    def tearDown(self):
+        self.root.destroy()
+        self.tmp_dir.cleanup()
+
+    def test_first_paint_within_target(self):
+        app = gui.BilibiliManagerGUI(self.root)
+        deadline = time.monotonic() + 10
+        while app.first_paint_ms is None and time.monotonic() < deadline:
+            self.root.update()
+        self.assertIsNotNone(app.first_paint_ms, "窗口没有绘制")
+        self.assertLess(app.first_paint_ms, gui.FIRST_PAINT_TARGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
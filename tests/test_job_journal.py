@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from job_journal import JobJournal
+
+
+class JobJournalOwnerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = JobJournal(os.path.join(self.tmp_dir.name, 'job_journal.jsonl'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pending_jobs_filtered_by_owner(self):
+        job_a = self.journal.create_job(2, [], '取消全部关注', open_plan=True, owner='1')
+        job_b = self.journal.create_job(1, [10, 11], owner='2')
+
+        self.assertEqual([job['job_id'] for job in self.journal.pending_jobs('1')], [job_a])
+        self.assertEqual([job['job_id'] for job in self.journal.pending_jobs('2')], [job_b])
+        self.assertEqual(self.journal.pending_jobs('3'), [])
+        self.assertIsNone(self.journal.get_job(job_a, '2'))
+        self.assertEqual(self.journal.get_job(job_a, '1')['owner'], '1')
+
+    def test_finish_keeps_other_accounts_jobs(self):
+        job_a = self.journal.create_job(2, [1], owner='1')
+        job_b = self.journal.create_job(2, [2], owner='2')
+        self.journal.record(job_a, 1, True)
+        self.journal.finish(job_a)
+
+        self.assertEqual(self.journal.pending_jobs('1'), [])
+        self.assertEqual(self.journal.get_job(job_b, '2')['remaining'], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+import bilibili_api
+from bilibili_api import RELATION_UNFOLLOW, BilibiliAPI, RelationExecutor
+
+STUB_CONFIG = {
+    'cookies': {'SESSDATA': 'stub', 'bili_jct': 'stub', 'DedeUserID': '1'},
+    'headers': {},
+    'settings': {'batch_size': 50, 'delay_between_requests': 0.001, 'max_retries': 1},
+}
+
+
+def json_response(payload, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode('utf-8')
+    return response
+
+
+class LoggedOutWithoutRefreshTest(unittest.TestCase):
+    """登录失效且无法刷新凭据（例如从浏览器导入登录、没有 refresh_token）"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp_dir.name, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump(STUB_CONFIG, f)
+        patch = mock.patch.object(bilibili_api, 'get_app_dir', return_value=self.tmp_dir.name)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.api = BilibiliAPI()
+        self.api.credentials.maybe_refresh = lambda: None
+        self.api.credentials.refresh = mock.Mock(return_value=False)
+        self.api.session.request = mock.Mock(
+            side_effect=lambda *args, **kwargs: json_response({'code': -101, 'message': '账号未登录'}))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_modify_relation_returns_result(self):
+        result, throttled = self.api._modify_relation(42, RELATION_UNFOLLOW)
+        self.assertEqual(result['code'], -101)
+        self.assertFalse(throttled)
+        self.api.credentials.refresh.assert_called_once_with(force=True)
+
+    def test_failure_is_not_treated_as_throttling(self):
+        self.assertFalse(self.api.unfollow_user(42))
+        self.assertEqual(RelationExecutor(self.api)._execute(42, RELATION_UNFOLLOW), (False, False))
+
+
+if __name__ == '__main__':
+    unittest.main()